@@ -0,0 +1,90 @@
+# import_time.py
+# Сколько стоит старт процесса: чистый Python, ядро игры без pygame, модули окна с pygame,
+# поиск шрифтов через SysFont и через кэш src/fonts.py, а также запуск пула процессов-воркеров.
+#
+#   python benchmarks/import_time.py --repeat 5 --workers 4
+import argparse
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+CASES = (
+    ("python без импортов", "pass", False),
+    ("ядро: logic + players", "import src.logic, src.players", False),
+    ("инструменты: simulate + tournament", "import src.simulate, src.tournament", False),
+    ("окно: src.game (pygame)", "import src.game", True),
+    ("pygame.init() + SysFont", "import pygame; pygame.init(); pygame.font.SysFont('Arial', 28, bold=True)", True),
+    ("display/font init + кэш шрифтов",
+     "import pygame; pygame.display.init(); from src.fonts import get_font; get_font('Arial', 28, True)", True),
+)
+
+
+def has_pygame():
+    try:
+        import pygame  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def run_case(code, repeat):
+    env = dict(os.environ, PYTHONPATH=ROOT, SDL_VIDEODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - started)
+    return statistics.median(times)
+
+
+def _import_engine():
+    import src.players  # noqa: F401
+
+
+def _import_window():
+    import src.game  # noqa: F401
+
+
+def _ready(_):
+    return os.getpid()
+
+
+def pool_startup(initializer, workers):
+    # spawn — как на Windows/macOS: каждый воркер заново импортирует всё, что ему нужно
+    context = multiprocessing.get_context("spawn")
+    started = time.perf_counter()
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=initializer) as pool:
+        list(pool.map(_ready, range(workers)))
+    return time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Время старта процессов с ядром игры и с pygame")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    gui = has_pygame()
+    for title, code, needs_pygame in CASES:
+        if needs_pygame and not gui:
+            print(f"{title:<40} pygame не установлен, пропуск")
+            continue
+        print(f"{title:<40} {run_case(code, args.repeat) * 1000:8.1f} мс")
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    print(f"пул из {args.workers} воркеров, импорт ядра: {pool_startup(_import_engine, args.workers) * 1000:8.1f} мс")
+    if gui:
+        print(f"пул из {args.workers} воркеров, импорт окна: {pool_startup(_import_window, args.workers) * 1000:8.1f} мс")
+
+
+if __name__ == "__main__":
+    main()
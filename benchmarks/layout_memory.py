@@ -0,0 +1,126 @@
+# layout_memory.py
+# Память на поле и на игрока: исходные Cell/Field (объекты со __dict__, свой Cell на клетку, никаких индексов)
+# против нынешних раскладок. У нынешних полей, кроме клеток, есть индекс серий, множество свободных клеток
+# и история ходов для отмены — это цена O(1)-проверок победы, ничьей, случайного хода и unmake_move.
+#
+#   python benchmarks/layout_memory.py
+#   python benchmarks/layout_memory.py --fill 0.9 --sizes 3x3:20000,100x100:20
+import argparse
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from src.logic import create_field  # noqa: E402
+from src.players import BotPlayer, HumanPlayer  # noqa: E402
+
+
+class LegacyCell:
+    # Cell из исходной версии (до __slots__), без изменений
+    def __init__(self, symbol=" "):
+        self.symbol = symbol
+
+    def draw(self):
+        return self.symbol
+
+    def is_empty(self):
+        return self.symbol == " "
+
+    def set_symbol(self, new_symbol):
+        if self.is_empty():
+            self.symbol = new_symbol
+            return True
+        return False
+
+
+class LegacyField:
+    # Field из исходной версии: только сетка объектов со __dict__, без индекса серий, свободных клеток и истории.
+    # Проверка победы и сохранение здесь не нужны — оставлен только ход
+    def __init__(self, y_size=3, x_size=3):
+        self.y_size = y_size
+        self.x_size = x_size
+        self.grid = [[LegacyCell() for _ in range(self.x_size)] for _ in range(self.y_size)]
+
+    def make_move(self, position, player):
+        total_cells = self.x_size * self.y_size
+        if position < 1 or position > total_cells:
+            return False
+
+        pos = position - 1
+        row = pos // self.x_size
+        col = pos % self.x_size
+
+        if row >= self.y_size or col >= self.x_size:
+            return False
+
+        cell = self.grid[row][col]
+        if cell.set_symbol(player):
+            return True
+        else:
+            return False
+
+
+class LegacyPlayer:
+    def __init__(self, name, symbol):
+        self.symbol = symbol
+        self.name = name
+
+
+def build_fields(layout, y_size, x_size, count, fill, seed):
+    rng = random.Random(seed)
+    moves = int(y_size * x_size * fill)
+    fields = []
+    for _ in range(count):
+        if layout == "legacy":
+            field = LegacyField(y_size, x_size)
+        else:
+            field = create_field(y_size, x_size, layout)
+        for number, position in enumerate(rng.sample(range(1, y_size * x_size + 1), moves)):
+            field.make_move(position, ("X", "O")[number % 2])
+        fields.append(field)
+    return fields
+
+
+def measure(build):
+    tracemalloc.start()
+    objects = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current / len(objects)
+
+
+def parse_sizes(text):
+    sizes = []
+    for item in text.split(","):
+        shape, count = item.split(":")
+        y_size, x_size = shape.lower().split("x")
+        sizes.append((int(y_size), int(x_size), int(count)))
+    return sizes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Сравнение раскладок Cell/Field/Player по памяти")
+    parser.add_argument("--sizes", default="3x3:20000,15x15:1000,100x100:10",
+                        help="поля и сколько их создать: YxX:N через запятую")
+    parser.add_argument("--fill", type=float, default=0.5, help="доля занятых клеток")
+    parser.add_argument("--players", type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    layouts = ("legacy", "cells", "compact", "bitboard")
+    print(f"{'поле':>9} " + " ".join(f"{layout:>18}" for layout in layouts) + "   (байт на поле / на клетку)")
+    for y_size, x_size, count in parse_sizes(args.sizes):
+        row = [measure(lambda: build_fields(layout, y_size, x_size, count, args.fill, 1)) for layout in layouts]
+        cells = y_size * x_size
+        print(f"{y_size:>4}x{x_size:<4} " + " ".join(f"{value:>10.0f} /{value / cells:>6.1f}" for value in row))
+
+    def players(cls):
+        return lambda: [cls("Игрок", ("X", "O")[i % 2]) for i in range(args.players)]
+
+    print(f"Player: прежний {measure(players(LegacyPlayer)):.0f} Б, "
+          f"HumanPlayer {measure(players(HumanPlayer)):.0f} Б, BotPlayer {measure(players(BotPlayer)):.0f} Б")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# make_unmake.py
+# Перебор дерева ходов прямо на Field: копия поля на каждый узел (copy.deepcopy) против make_move/unmake_move.
+# Считается perft — число позиций до заданной глубины, партии с победой дальше не продолжаются.
+#
+#   python benchmarks/make_unmake.py --board 5x5:4 --depth 3
+import argparse
+import copy
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from src.logic import create_field  # noqa: E402
+from src.tournament import parse_board  # noqa: E402
+
+SYMBOLS = ("X", "O")
+
+
+def perft_copy(field, depth, turn=0):
+    if depth == 0:
+        return 1
+    nodes = 0
+    for position in list(field.free_cells):
+        child = copy.deepcopy(field)
+        child.make_move(position, SYMBOLS[turn])
+        if child.last_move_wins(SYMBOLS[turn]) or child.is_draw():
+            nodes += 1
+        else:
+            nodes += perft_copy(child, depth - 1, 1 - turn)
+    return nodes
+
+
+def perft_unmake(field, depth, turn=0):
+    if depth == 0:
+        return 1
+    nodes = 0
+    # Список копируется: make/unmake меняют порядок free_cells, а restore возвращает его только в конце
+    for position in list(field.free_cells):
+        field.make_move(position, SYMBOLS[turn])
+        if field.last_move_wins(SYMBOLS[turn]) or field.is_draw():
+            nodes += 1
+        else:
+            nodes += perft_unmake(field, depth - 1, 1 - turn)
+        field.unmake_move()
+    return nodes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Перебор ходов: копии поля против make/unmake")
+    parser.add_argument("--board", default="5x5:4", help="размер поля, например 3x3 или 15x15:5")
+    parser.add_argument("--depth", type=int, default=3)
+    args = parser.parse_args(argv)
+    y_size, x_size, win_length = parse_board(args.board)
+
+    print(f"{'поле':<10}{'способ':<14}{'позиций':>10}{'время, с':>10}{'позиций/с':>12}")
+    for backend in ("cells", "compact", "bitboard"):
+        for title, perft in (("deepcopy", perft_copy), ("make/unmake", perft_unmake)):
+            if backend == "bitboard" and perft is perft_copy:
+                # grid у BitField — представление, а не слот: deepcopy его не восстановит
+                continue
+            field = create_field(y_size, x_size, backend, win_length)
+            started = time.perf_counter()
+            nodes = perft(field, args.depth)
+            elapsed = time.perf_counter() - started
+            print(f"{backend:<10}{title:<14}{nodes:>10}{elapsed:>10.2f}{nodes / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# session_memory.py
+# Сколько памяти занимают простаивающие партии сервера: прежняя раскладка (Field из Cell + два Player)
+# против компактных записей SessionStore и против выгрузки на диск.
+#
+#   python benchmarks/session_memory.py --sessions 100000 --budget-mb 64
+import argparse
+import os
+import random
+import secrets
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from src.logic import create_field  # noqa: E402
+from src.players import HumanPlayer  # noqa: E402
+from src.sessions import SYMBOLS, SessionStore  # noqa: E402
+
+
+def traced(build):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+
+def play_moves(field, rng, moves):
+    cells = rng.sample(range(1, field.x_size * field.y_size + 1), moves)
+    for number, position in enumerate(cells):
+        field.make_move(position, SYMBOLS[number % 2])
+
+
+def old_layout(count, args, rng):
+    sessions = []
+    for number in range(count):
+        field = create_field(args.y_size, args.x_size, "cells", args.win_length)
+        play_moves(field, rng, args.moves)
+        sessions.append((field, HumanPlayer("Игрок", "X"), HumanPlayer("Игрок", "O")))
+    return sessions
+
+
+def fill_store(store, count, args, rng):
+    for _ in range(count):
+        record = store.create(args.y_size, args.x_size, args.win_length)
+        record.names = ("Игрок", "Игрок")
+        record.tokens = (secrets.token_hex(16), secrets.token_hex(16))
+        play_moves(store.field(record), rng, args.moves)
+        record.moves = args.moves
+    return store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Память на простаивающую сессию сервера")
+    parser.add_argument("--sessions", type=int, default=100000)
+    parser.add_argument("--y-size", type=int, default=3)
+    parser.add_argument("--x-size", type=int, default=3)
+    parser.add_argument("--win-length", type=int, default=None)
+    parser.add_argument("--moves", type=int, default=4)
+    parser.add_argument("--sample", type=int, default=2000,
+                        help="сколько сессий в старой раскладке реально создать (дальше — экстраполяция)")
+    parser.add_argument("--budget-mb", type=float, default=64.0)
+    args = parser.parse_args(argv)
+    mb = 1024 * 1024
+
+    _, old_bytes, _ = traced(lambda: old_layout(args.sample, args, random.Random(1)))
+    old_per_session = old_bytes / args.sample
+    print(f"Field(cells) + Player: {old_per_session:.0f} Б/сессию, "
+          f"на {args.sessions} сессий ~{old_per_session * args.sessions / mb:.1f} МБ (по {args.sample})")
+
+    # max_hot=1: все партии простаивают, живым остаётся только последнее поле
+    store, warm_bytes, elapsed = traced(
+        lambda: fill_store(SessionStore(max_hot=1), args.sessions, args, random.Random(1)))
+    stats = store.stats()
+    print(f"SessionStore в памяти: {warm_bytes / args.sessions:.0f} Б/сессию "
+          f"(оценка store.stats: {stats['bytes_per_record']:.0f}), всего {warm_bytes / mb:.1f} МБ, "
+          f"заполнение {elapsed:.1f} с")
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "sessions.db")
+        disk_store = SessionStore(path, max_hot=1, idle_timeout=0)
+        fill_store(disk_store, args.sessions, args, random.Random(1))
+        tracemalloc.start()
+        started = time.perf_counter()
+        disk_store.evict_idle()
+        evict_time = time.perf_counter() - started
+        cold_bytes, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        disk_stats = disk_store.stats()
+
+        started = time.perf_counter()
+        ids = random.Random(2).sample(range(1, args.sessions + 1), 1000)
+        for session_id in ids:
+            disk_store.field(disk_store.get(session_id))
+        rehydrate_time = (time.perf_counter() - started) / len(ids)
+        disk_store.close()
+    print(f"После выгрузки на диск: в памяти {disk_stats['records']} записей, на диске {disk_stats['on_disk']}, "
+          f"остаток выделений Python {cold_bytes / mb:.2f} МБ; выгрузка {evict_time:.1f} с, "
+          f"подъём одной партии {rehydrate_time * 1e6:.0f} мкс")
+
+    fits = warm_bytes / mb <= args.budget_mb
+    print(f"Бюджет {args.budget_mb:.0f} МБ на {args.sessions} сессий в памяти: {'укладываемся' if fits else 'превышен'}")
+    sys.exit(0 if fits else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,35 @@
 # main.py
-import pygame
 import sys
-from src.game import Game
-from src.main_menu import MainMenu
+from src.config_loader import ConfigLoader
+from src import profiling
 if __name__ == "__main__":
-    menu = MainMenu()
+    config_loader = ConfigLoader()
+
+    # pygame и модули окна подгружаются только здесь: ядро (src.logic, src.players и т. д.) без них
+    from src.main_menu import MainMenu
+    menu = MainMenu(*config_loader.get_loop_settings())
     choice = menu.run()
 
-    if choice == "new":
-        game = Game(load_saved=False)
-    elif choice == "continue":
-        game = Game(load_saved=True)
-    else:
+    if choice not in ("new", "continue"):
+        import pygame
         pygame.quit()
         sys.exit()
 
-    game.run()
\ No newline at end of file
+    network = config_loader.get_network_settings().get("enabled")
+    if network:
+        from src.network_client import NetworkGame
+    else:
+        from src.game import Game
+
+    # Замеры включаются после импорта окна, чтобы обернуть и GameRenderer.draw
+    profile = config_loader.get_profiling_settings()
+    if profile.get("enabled"):
+        profiling.enable(profile.get("format") == "chrome", profile.get("output", "profile.json"),
+                         profile.get("format", "json"), profile.get("overlay", True))
+
+    if network:
+        game = NetworkGame.from_config(config_loader)
+    else:
+        game = Game(load_saved=choice == "continue")
+
+    game.run()
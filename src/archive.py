@@ -0,0 +1,381 @@
+# archive.py
+# Архив законченных партий в sqlite3: размер поля, игроки, ходы, результат.
+# Каждая позиция каждой партии попадает в индекс positions по хэшу канонической формы
+# (с учётом поворотов и отражений поля), поэтому вопросы «какие партии прошли через эту позицию»
+# и «как часто из неё выигрывают» решаются поиском по B-дереву, а не перебором партий.
+import argparse
+import hashlib
+import os
+import queue
+import sqlite3
+import struct
+import threading
+from .logic import Display, create_field, required_run_lengths
+from .symmetry import symmetry_permutations
+
+ARCHIVE_FILE = "games.db"
+EMPTY_CHARS = ".-_ "
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS games (
+        id INTEGER PRIMARY KEY,
+        y_size INTEGER NOT NULL,
+        x_size INTEGER NOT NULL,
+        win_length INTEGER,
+        player1 TEXT, symbol1 TEXT NOT NULL,
+        player2 TEXT, symbol2 TEXT NOT NULL,
+        first INTEGER NOT NULL,
+        moves BLOB NOT NULL,
+        winner TEXT,
+        source TEXT
+    )""",
+    # Без rowid: таблица сама является индексом по (hash, game_id)
+    """CREATE TABLE IF NOT EXISTS positions (
+        hash INTEGER NOT NULL,
+        game_id INTEGER NOT NULL,
+        ply INTEGER NOT NULL,
+        PRIMARY KEY (hash, game_id)
+    ) WITHOUT ROWID""",
+)
+
+
+class ArchivedGame:
+    __slots__ = ('y_size', 'x_size', 'win_length', 'names', 'symbols', 'first', 'moves', 'winner', 'source')
+
+    def __init__(self, y_size, x_size, win_length, names, symbols, first, moves, winner, source=None):
+        # moves — позиции 1..x*y по очереди, начиная с игрока first (0 или 1); winner — символ или None
+        self.y_size = y_size
+        self.x_size = x_size
+        self.win_length = win_length
+        self.names = tuple(names)
+        self.symbols = tuple(symbols)
+        self.first = first
+        self.moves = list(moves)
+        self.winner = winner
+        self.source = source
+
+
+class PositionHasher:
+    # Хэш позиции не зависит от симметрии поля и от того, каким игроком записан символ:
+    # клетка кодируется номером символа в отсортированной паре, а из всех симметричных копий берётся наименьшая
+    _cache = {}
+
+    def __init__(self, y_size, x_size, win_length=None):
+        key = (y_size, x_size)
+        if key not in self._cache:
+            self._cache[key] = symmetry_permutations(y_size, x_size)
+        self.perms = self._cache[key]
+        self.cells = y_size * x_size
+        # Правила записываем длинами рядов, чтобы win_length=None и явная классическая длина совпадали
+        self.salt = f"{y_size}x{x_size}:{required_run_lengths(y_size, x_size, win_length)}|".encode()
+
+    def digest(self, images):
+        data = hashlib.blake2b(self.salt + bytes(min(images)), digest_size=8).digest()
+        return struct.unpack("<q", data)[0]
+
+    def game_hashes(self, moves, codes):
+        # Хэши позиций до первого хода, после каждого хода; codes[i] — код символа, сделавшего ход i
+        images = [bytearray(self.cells) for _ in self.perms]
+        hashes = [self.digest(images)]
+        for position, code in zip(moves, codes):
+            for image, perm in zip(images, self.perms):
+                image[perm[position - 1]] = code
+            hashes.append(self.digest(images))
+        return hashes
+
+    def field_hash(self, field, symbols):
+        codes = symbol_codes(symbols)
+        cells = bytearray(self.cells)
+        index = 0
+        for row in field.grid:
+            for cell in row:
+                cells[index] = codes.get(cell.symbol, 0)
+                index += 1
+        images = []
+        for perm in self.perms:
+            image = bytearray(self.cells)
+            for source, target in enumerate(perm):
+                image[target] = cells[source]
+            images.append(image)
+        return self.digest(images)
+
+
+def symbol_codes(symbols):
+    return {symbol: code for code, symbol in enumerate(sorted(symbols), 1)}
+
+
+def pack_moves(moves):
+    return struct.pack(f"<{len(moves)}H", *moves)
+
+
+def unpack_moves(data):
+    return list(struct.unpack(f"<{len(data) // 2}H", data))
+
+
+def replay(game, backend="cells"):
+    # Поле после всех ходов партии и символ победителя (None — ничья или партия не закончена)
+    field = create_field(game.y_size, game.x_size, backend, game.win_length)
+    index = game.first
+    winner = None
+    for position in game.moves:
+        symbol = game.symbols[index]
+        if winner is not None or not field.make_move(position, symbol):
+            raise ValueError(f"Недопустимый ход {position} в партии")
+        if field.last_move_wins(symbol):
+            winner = symbol
+        index = 1 - index
+    return field, winner
+
+
+class GameArchive:
+    def __init__(self, path=ARCHIVE_FILE):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            self.db.execute(statement)
+        self.db.commit()
+        self.next_id = self.db.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM games").fetchone()[0]
+
+    def add_game(self, game):
+        return self.add_games([game])[0]
+
+    def add_games(self, games, batch_size=1000):
+        # Пачками в одной транзакции: executemany на партии и на их позиции
+        ids = []
+        game_rows = []
+        position_rows = []
+        for game in games:
+            game_id = self.next_id
+            self.next_id += 1
+            ids.append(game_id)
+            game_rows.append((
+                game_id, game.y_size, game.x_size, game.win_length,
+                game.names[0], game.symbols[0], game.names[1], game.symbols[1],
+                game.first, pack_moves(game.moves), game.winner, game.source
+            ))
+            codes = symbol_codes(game.symbols)
+            movers = [codes[game.symbols[(game.first + ply) % 2]] for ply in range(len(game.moves))]
+            hasher = PositionHasher(game.y_size, game.x_size, game.win_length)
+            position_rows.extend(
+                (position_hash, game_id, ply)
+                for ply, position_hash in enumerate(hasher.game_hashes(game.moves, movers))
+            )
+            if len(game_rows) >= batch_size:
+                self._flush(game_rows, position_rows)
+        self._flush(game_rows, position_rows)
+        return ids
+
+    def _flush(self, game_rows, position_rows):
+        if not game_rows:
+            return
+        with self.db:
+            self.db.executemany("INSERT INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", game_rows)
+            self.db.executemany("INSERT OR IGNORE INTO positions VALUES (?, ?, ?)", position_rows)
+        game_rows.clear()
+        position_rows.clear()
+
+    def games_through(self, position_hash, limit=None):
+        # [(id партии, номер хода, на котором встретилась позиция), ...]
+        query = "SELECT game_id, ply FROM positions WHERE hash = ? ORDER BY game_id"
+        params = (position_hash,)
+        if limit is not None:
+            query += " LIMIT ?"
+            params += (limit,)
+        return self.db.execute(query, params).fetchall()
+
+    def position_stats(self, position_hash):
+        # {символ победителя или None: число партий} по партиям, прошедшим через позицию
+        rows = self.db.execute(
+            "SELECT g.winner, COUNT(*) FROM positions p JOIN games g ON g.id = p.game_id "
+            "WHERE p.hash = ? GROUP BY g.winner", (position_hash,)
+        ).fetchall()
+        return dict(rows)
+
+    def get_game(self, game_id):
+        row = self.db.execute(
+            "SELECT y_size, x_size, win_length, player1, symbol1, player2, symbol2, first, moves, winner, source "
+            "FROM games WHERE id = ?", (game_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        y_size, x_size, win_length, player1, symbol1, player2, symbol2, first, moves, winner, source = row
+        return ArchivedGame(y_size, x_size, win_length, (player1, player2), (symbol1, symbol2),
+                            first, unpack_moves(moves), winner, source)
+
+    def count(self):
+        return self.db.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+    def close(self):
+        self.db.close()
+
+
+class ArchiveWriter:
+    # Запись партий в архив из фонового потока, как SaveWriter для сохранений: игровой цикл только
+    # кладёт партию в очередь, а соединение sqlite открывается и живёт в потоке записи
+    def __init__(self, path=ARCHIVE_FILE):
+        self.path = path
+        self.games = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name="archive-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, game):
+        self.games.put(game)
+
+    def close(self):
+        # Дописываем всё, что уже в очереди, и ждём поток
+        self.games.put(None)
+        self.thread.join()
+
+    def _run(self):
+        archive = None
+        while True:
+            game = self.games.get()
+            if game is None:
+                break
+            try:
+                if archive is None:
+                    archive = GameArchive(self.path)
+                archive.add_game(game)
+            except Exception as e:
+                print(f"Не удалось записать партию в архив: {e}")
+        if archive is not None:
+            archive.close()
+
+
+def journal_games(paths, skipped=None):
+    # Законченные партии из журналов ходов; незаконченные пропускаются (их число — в skipped)
+    from .journal import JournalError, MoveJournal
+    for path in paths:
+        try:
+            journal = MoveJournal.open(path)
+            history = journal.history()
+        except (OSError, JournalError):
+            if skipped is not None:
+                skipped.append(path)
+            continue
+        first = history[0][0] if history else journal.starting_index
+        game = ArchivedGame(journal.y_size, journal.x_size, journal.win_length, journal.names, journal.symbols,
+                            first, [position for _, position in history], None, os.path.basename(path))
+        field, game.winner = replay(game)
+        if game.winner is None and not field.is_draw():
+            if skipped is not None:
+                skipped.append(path)
+            continue
+        yield game
+
+
+def dataset_games(folder, names=("Игрок 1", "Игрок 2")):
+    # Партии из шардов src.dataset: записи одной партии идут подряд, но могут перейти в следующий шард
+    import numpy as np
+    from .batch_eval import FIRST
+    from .dataset import load_manifest, open_shards
+    manifest = load_manifest(folder)
+    source = os.path.basename(os.path.normpath(folder))
+    pending = None
+
+    def finish(game_id, to_move, moves, outcome):
+        first = 0 if to_move[0] == FIRST else 1
+        winner = None
+        if outcome:
+            last_symbol = "X" if to_move[-1] == FIRST else "O"
+            winner = last_symbol if outcome > 0 else ("O" if last_symbol == "X" else "X")
+        return ArchivedGame(manifest['y_size'], manifest['x_size'], manifest['win_length'], names, ("X", "O"),
+                            first, moves, winner, f"{source}#{game_id}")
+
+    for array in open_shards(folder, manifest):
+        games = array['game']
+        bounds = [0] + (np.flatnonzero(games[1:] != games[:-1]) + 1).tolist() + [len(array)]
+        for start, end in zip(bounds, bounds[1:]):
+            game_id = int(games[start])
+            part = array[start:end]
+            to_move = part['to_move'].tolist()
+            moves = part['move'].tolist()
+            if pending is not None and pending[0] == game_id:
+                to_move = pending[1] + to_move
+                moves = pending[2] + moves
+            elif pending is not None:
+                yield finish(*pending)
+            pending = (game_id, to_move, moves, int(part['outcome'][-1]))
+    if pending is not None:
+        yield finish(*pending)
+
+
+def parse_position(text, y_size, x_size, symbols):
+    # "X.O/.X./..." — строки поля через "/", пустая клетка — ".", "-", "_" или пробел
+    rows = text.split("/")
+    if len(rows) != y_size or any(len(row) != x_size for row in rows):
+        raise ValueError(f"Позиция должна состоять из {y_size} строк по {x_size} клеток")
+    field = create_field(y_size, x_size)
+    for row_index, row in enumerate(rows):
+        for col_index, char in enumerate(row):
+            if char in EMPTY_CHARS:
+                continue
+            if char not in symbols:
+                raise ValueError(f"Неизвестный символ '{char}' в позиции")
+            field.make_move(row_index * x_size + col_index + 1, char)
+    return field
+
+
+def main(argv=None):
+    from .tournament import parse_board
+    parser = argparse.ArgumentParser(description="Архив партий с поиском по позициям")
+    parser.add_argument("--db", default=ARCHIVE_FILE)
+    commands = parser.add_subparsers(dest="command", required=True)
+    journals = commands.add_parser("import-journal", help="добавить законченные партии из журналов")
+    journals.add_argument("paths", nargs="+")
+    dataset = commands.add_parser("import-dataset", help="добавить партии из датасета src.dataset")
+    dataset.add_argument("folder")
+    query = commands.add_parser("query", help="партии через позицию и результаты из неё")
+    query.add_argument("--board", default="3x3", help="размер поля, например 3x3 или 15x15:5")
+    query.add_argument("--position", default=None, help='клетки по строкам, например "X.O/.X./..."')
+    query.add_argument("--moves", default=None, help="ходы по очереди с первого символа, например 5,1,9")
+    query.add_argument("--symbols", default="XO")
+    query.add_argument("--list", type=int, default=10, help="сколько партий показать")
+    args = parser.parse_args(argv)
+
+    archive = GameArchive(args.db)
+    if args.command == "import-journal":
+        skipped = []
+        added = archive.add_games(journal_games(args.paths, skipped))
+        Display.draw(f"Добавлено партий: {len(added)}, пропущено (не закончены или повреждены): {len(skipped)}")
+    elif args.command == "import-dataset":
+        added = archive.add_games(dataset_games(args.folder))
+        Display.draw(f"Добавлено партий: {len(added)}, всего в архиве: {archive.count()}")
+    elif args.command == "query":
+        # Ошибки во вводе — сообщением argparse, а не трассировкой
+        try:
+            y_size, x_size, win_length = parse_board(args.board)
+            symbols = tuple(args.symbols)
+            if args.position:
+                field = parse_position(args.position, y_size, x_size, symbols)
+            else:
+                field = create_field(y_size, x_size, win_length=win_length)
+                for ply, move in enumerate(move for move in (args.moves or "").split(",") if move.strip()):
+                    if not move.strip().isdigit():
+                        raise ValueError(f"Ход должен быть номером клетки, а не '{move}'")
+                    position = int(move)
+                    if not field.make_move(position, symbols[ply % 2]):
+                        raise ValueError(f"Недопустимый ход {position}")
+        except ValueError as e:
+            archive.close()
+            query.error(str(e))
+        position_hash = PositionHasher(y_size, x_size, win_length).field_hash(field, symbols)
+        stats = archive.position_stats(position_hash)
+        total = sum(stats.values())
+        Display.draw(f"Партий через позицию: {total}")
+        for winner, count in sorted(stats.items(), key=lambda item: -item[1]):
+            title = f"победа {winner}" if winner is not None else "ничья"
+            Display.draw(f"  {title}: {count} ({100 * count / total:.1f}%)")
+        for game_id, ply in archive.games_through(position_hash, args.list):
+            game = archive.get_game(game_id)
+            Display.draw(f"#{game_id} (ход {ply}): {game.names[0]} ({game.symbols[0]}) против "
+                         f"{game.names[1]} ({game.symbols[1]}), первым {game.symbols[game.first]}, "
+                         f"ходы {','.join(map(str, game.moves))}, "
+                         f"{'победа ' + game.winner if game.winner else 'ничья'}")
+    archive.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# batch_eval.py
+# Проверка тысяч позиций на победу/ничью одним вызовом через NumPy
+import numpy as np
+from .logic import Cell, DIRECTIONS, Field, required_run_lengths
+
+EMPTY, FIRST, SECOND = 0, 1, 2
+ONGOING, FIRST_WINS, SECOND_WINS, DRAW, INVALID = 0, 1, 2, 3, -1
+
+
+def _has_run(mask, need, dr, dc):
+    # mask: (N, y, x) из 0/1. Складываем need сдвинутых срезов — сумма need означает ряд длины need
+    _, y_size, x_size = mask.shape
+    span_r = dr * (need - 1)
+    span_c = abs(dc) * (need - 1)
+    if need <= 0 or span_r >= y_size or span_c >= x_size:
+        return np.zeros(mask.shape[0], dtype=bool)
+
+    rows = y_size - span_r
+    cols = x_size - span_c
+    col0 = span_c if dc < 0 else 0
+    total = np.zeros((mask.shape[0], rows, cols), dtype=np.int16)
+    for i in range(need):
+        r = dr * i
+        c = col0 + dc * i
+        total += mask[:, r:r + rows, c:c + cols]
+    return (total == need).reshape(mask.shape[0], -1).any(axis=1)
+
+
+def has_line(boards, value, win_length=None):
+    # Для каждой доски: есть ли у игрока value выигрышный ряд по правилам Field
+    boards = np.asarray(boards, dtype=np.int8)
+    _, y_size, x_size = boards.shape
+    mask = (boards == value).astype(np.int8)
+    result = np.zeros(boards.shape[0], dtype=bool)
+    for (dr, dc), need in zip(DIRECTIONS, required_run_lengths(y_size, x_size, win_length)):
+        if need:
+            result |= _has_run(mask, need, dr, dc)
+    return result
+
+
+def evaluate_boards(boards, win_length=None):
+    # boards: (N, y_size, x_size) int8, клетки EMPTY/FIRST/SECOND.
+    # Возвращает int8-массив статусов: ONGOING, FIRST_WINS, SECOND_WINS, DRAW или INVALID (ряды у обоих)
+    boards = np.asarray(boards, dtype=np.int8)
+    if boards.ndim != 3:
+        raise ValueError("Ожидается массив формы (N, y_size, x_size)")
+
+    first = has_line(boards, FIRST, win_length)
+    second = has_line(boards, SECOND, win_length)
+    full = (boards != EMPTY).reshape(boards.shape[0], -1).all(axis=1)
+
+    status = np.full(boards.shape[0], ONGOING, dtype=np.int8)
+    status[full] = DRAW
+    status[first] = FIRST_WINS
+    status[second] = SECOND_WINS
+    status[first & second] = INVALID
+    return status
+
+
+def grid_to_array(grid, symbols=("X", "O")):
+    codes = {" ": EMPTY, symbols[0]: FIRST, symbols[1]: SECOND}
+    return np.array([[codes[cell.symbol] for cell in row] for row in grid], dtype=np.int8)
+
+
+def fields_to_array(fields, symbols=("X", "O")):
+    return np.stack([grid_to_array(field.grid, symbols) for field in fields])
+
+
+def array_to_grid(board, symbols=("X", "O")):
+    names = {EMPTY: " ", FIRST: symbols[0], SECOND: symbols[1]}
+    return [[Cell(names[int(value)]) for value in row] for row in board]
+
+
+def array_to_field(board, symbols=("X", "O"), win_length=None, field_cls=Field):
+    board = np.asarray(board, dtype=np.int8)
+    y_size, x_size = board.shape
+    field = field_cls(y_size, x_size, win_length)
+    names = {FIRST: symbols[0], SECOND: symbols[1]}
+    for row, col in zip(*np.nonzero(board)):
+        field.make_move(int(row) * x_size + int(col) + 1, names[int(board[row, col])])
+    return field
@@ -0,0 +1,63 @@
+# bot_worker.py
+# Ход бота считается в фоновом потоке и приходит в игровой цикл событием BOT_MOVE_EVENT
+import random
+import threading
+import time
+import traceback
+import pygame
+
+BOT_MOVE_EVENT = pygame.event.custom_type()
+
+
+class BotWorker:
+    def __init__(self, event_type=BOT_MOVE_EVENT, min_delay=0.5):
+        # min_delay — пауза перед ходом бота, как у прежнего таймера на 500 мс
+        self.event_type = event_type
+        self.min_delay = min_delay
+        self.token = 0
+        self.cancel_event = None
+        self.thread = None
+
+    def start(self, player, field):
+        self.cancel()
+        self.token += 1
+        token = self.token
+        cancel = self.cancel_event = threading.Event()
+        # Бот получает копию: главный поток может отменить ход (Ctrl+Z), пока идёт расчёт
+        snapshot = field.snapshot()
+
+        def think():
+            started = time.perf_counter()
+            error = None
+            try:
+                move = player.get_move(snapshot, cancel)
+            except Exception as e:
+                # Ошибка бота не должна оставлять окно ждать ход: пишем её и ходим случайно
+                error = f"{type(e).__name__}: {e}"
+                print(f"Ошибка расчёта хода ({player.name}): {error}, ход выбран случайно")
+                traceback.print_exc()
+                move = snapshot.random_free_position(random) or 1
+            remaining = self.min_delay - (time.perf_counter() - started)
+            if remaining > 0:
+                cancel.wait(remaining)
+            if not cancel.is_set():
+                pygame.event.post(pygame.event.Event(self.event_type, move=move, token=token, error=error))
+
+        self.thread = threading.Thread(target=think, name="bot-worker", daemon=True)
+        self.thread.start()
+
+    def is_current(self, event):
+        # Ход от отменённого расчёта (после перезапуска) игнорируется
+        return event.token == self.token and self.cancel_event is not None and not self.cancel_event.is_set()
+
+    def cancel(self, timeout=1.0):
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+        self.thread = None
+
+    def finish(self):
+        # Ход принят: поток своё отработал, отменять нечего
+        self.cancel_event = None
+        self.thread = None
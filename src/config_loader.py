@@ -0,0 +1,58 @@
+# config_loader.py
+# Чтение config.json без pygame: настройки нужны раньше, чем открывается окно
+import json
+import sys
+
+
+class ConfigLoader:
+    def __init__(self, filename="config.json"):
+        self.config = self._load_config(filename)
+
+    def _load_config(self, filename):
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            print(f"Ошибка: Файл конфигурации '{filename}' не найден.")
+            sys.exit()
+        except json.JSONDecodeError:
+            print(f"Ошибка: Некорректный формат JSON в файле '{filename}'.")
+            sys.exit()
+
+    def get_field_size(self):
+        settings = self.config.get("field_settings", {})
+        return settings.get("y_size", 3), settings.get("x_size", 3)
+
+    def get_field_backend(self):
+        settings = self.config.get("field_settings", {})
+        return settings.get("backend", "cells").lower()
+
+    def get_win_length(self):
+        settings = self.config.get("field_settings", {})
+        return settings.get("win_length")
+
+    def get_player_data(self, player_key):
+        return self.config.get(player_key, {})
+
+    def get_starting_player_symbol(self):
+        return self.config.get("starting_player_symbol", "X")
+
+    def get_save_format(self):
+        return self.config.get("save_format", "journal").lower()
+
+    def get_loop_settings(self):
+        # loop: "event" — ждём событий и перерисовываем только при изменениях, "poll" — опрос каждый кадр
+        settings = self.config.get("display_settings", {})
+        return settings.get("loop", "event").lower() == "event", settings.get("fps", 60)
+
+    def get_profiling_settings(self):
+        # enabled: true — замеры горячих методов, отчёт в output (format: "json" или "chrome") при выходе
+        return self.config.get("profiling", {})
+
+    def get_network_settings(self):
+        # enabled: true — играть через сервер (python -m src.server) вместо локальной партии
+        return self.config.get("network_settings", {})
+
+    def get_archive_settings(self):
+        # enabled: true — законченные партии дописываются в архив path (python -m src.archive query ...)
+        return self.config.get("archive", {})
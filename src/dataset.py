@@ -0,0 +1,250 @@
+# dataset.py
+# Датасет самоигры для обучения оценки позиций: боты играют партии в процессах-воркерах,
+# каждая позиция (доска до хода, кто ходит, ход, итог партии) — запись фиксированного размера.
+# Записи пишутся потоком в шарды .npy через memmap, поэтому память не растёт с числом партий,
+# а читатель открывает шард через np.load(..., mmap_mode='r') и идёт по нему без копий и разбора JSON.
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .batch_eval import EMPTY, FIRST, SECOND
+from .logic import create_field, write_config_atomic
+from .players import create_player
+from .search import reset_engines
+from .simulate import play_game
+from .tournament import board_name, parse_board
+
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+CODES = {"X": FIRST, "O": SECOND}
+
+
+def record_dtype(y_size, x_size):
+    # board — позиция до хода (0 — пусто, 1 — X, 2 — O), outcome — итог для того, кто ходит: 1, 0, -1
+    return np.dtype([
+        ('board', np.int8, (y_size, x_size)),
+        ('to_move', np.int8),
+        ('move', np.int32),
+        ('outcome', np.int8),
+        ('ply', np.int16),
+        ('game', np.int32),
+    ])
+
+
+class ShardWriter:
+    # Шард — .npy заранее заданной ёмкости, открытый через memmap: записи копируются прямо в файл.
+    # Незаполненный последний шард при закрытии обрезается до числа записей
+    def __init__(self, folder, prefix, dtype, capacity):
+        self.folder = folder
+        self.prefix = prefix
+        self.dtype = dtype
+        self.capacity = capacity
+        self.shards = []
+        self.array = None
+        self.filled = 0
+
+    def _open(self):
+        name = f"{self.prefix}-{len(self.shards):04d}.npy"
+        self.array = np.lib.format.open_memmap(
+            os.path.join(self.folder, name), mode='w+', dtype=self.dtype, shape=(self.capacity,))
+        self.shards.append({'file': name, 'records': 0})
+        self.filled = 0
+
+    def write(self, records):
+        start = 0
+        while start < len(records):
+            if self.array is None or self.filled == self.capacity:
+                self._finish()
+                self._open()
+            count = min(len(records) - start, self.capacity - self.filled)
+            self.array[self.filled:self.filled + count] = records[start:start + count]
+            self.filled += count
+            self.shards[-1]['records'] = self.filled
+            start += count
+
+    def _finish(self):
+        if self.array is None:
+            return
+        self.array.flush()
+        self.array = None
+        if self.filled < self.capacity:
+            path = os.path.join(self.folder, self.shards[-1]['file'])
+            data = np.load(path, mmap_mode='r')
+            with open(path + ".tmp", 'wb') as f:
+                np.save(f, data[:self.filled])
+            del data
+            os.replace(path + ".tmp", path)
+
+    def close(self):
+        self._finish()
+        return self.shards
+
+
+def fill_game(records, moves, winner):
+    # records — буфер на y_size * x_size позиций; строка i — доска перед ходом i
+    count = len(moves)
+    flat = records['board'].reshape(len(records), -1)
+    flat[0] = EMPTY
+    for ply in range(1, count):
+        flat[ply] = flat[ply - 1]
+        symbol, position = moves[ply - 1]
+        flat[ply, position - 1] = CODES[symbol]
+    to_move = records['to_move'][:count]
+    to_move[:] = [CODES[symbol] for symbol, _ in moves]
+    records['move'][:count] = [position for _, position in moves]
+    records['ply'][:count] = np.arange(count)
+    if winner is None:
+        records['outcome'][:count] = 0
+    else:
+        records['outcome'][:count] = np.where(to_move == CODES[winner], 1, -1)
+    return records[:count]
+
+
+def play_chunk(task):
+    # Выполняется в процессе-воркере: играет пачку партий и пишет их в свои шарды
+    index, start, count, board, players, settings, backend, base_seed, folder, capacity = task
+    y_size, x_size, win_length = board
+    dtype = record_dtype(y_size, x_size)
+    # Больше, чем по записи на клетку в каждой партии, пачка не даст: шард под неё не раздуваем,
+    # иначе каждая пачка выделяет и потом обрезает копированием файл на shard_records записей
+    writer = ShardWriter(folder, f"shard-{index:05d}", dtype, min(capacity, count * y_size * x_size))
+    buffer = np.zeros(y_size * x_size, dtype)
+    results = {"X": 0, "O": 0, "draw": 0}
+    for game_index in range(start, start + count):
+        # Сид зависит только от номера партии, поэтому датасет не зависит от числа процессов
+        rng = random.Random(f"{base_seed}:{board_name(board)}:{game_index}")
+        reset_engines()
+        player_x = create_player(players[0], "Игрок 1", "X", settings, rng)
+        player_o = create_player(players[1], "Игрок 2", "O", settings, rng)
+        field = create_field(y_size, x_size, backend, win_length)
+        moves = []
+
+        def on_move(symbol, position):
+            moves.append((symbol, position))
+
+        if game_index % 2:
+            winner, _ = play_game(field, player_o, player_x, on_move)
+        else:
+            winner, _ = play_game(field, player_x, player_o, on_move)
+        results[winner or "draw"] += 1
+        records = fill_game(buffer, moves, winner)
+        records['game'] = game_index
+        writer.write(records)
+    return writer.close(), results
+
+
+def generate(folder, games, board=(3, 3, None), players=("bot", "bot"), settings=None, backend="cells",
+             seed=0, shard_records=1 << 20, chunk_size=500, workers=None):
+    os.makedirs(folder, exist_ok=True)
+    tasks = [
+        (index, start, min(chunk_size, games - start), board, tuple(players), settings or {}, backend,
+         seed, folder, shard_records)
+        for index, start in enumerate(range(0, games, chunk_size))
+    ]
+    shards = []
+    results = {"X": 0, "O": 0, "draw": 0}
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        # Воркер возвращает только имена шардов и счётчики, сами записи уже лежат на диске
+        for task_shards, task_results in pool.map(play_chunk, tasks):
+            shards.extend(task_shards)
+            for key, value in task_results.items():
+                results[key] += value
+    elapsed = time.perf_counter() - started
+
+    y_size, x_size, win_length = board
+    manifest = {
+        'format': FORMAT_VERSION,
+        'y_size': y_size,
+        'x_size': x_size,
+        'win_length': win_length,
+        'dtype': np.lib.format.dtype_to_descr(record_dtype(y_size, x_size)),
+        'players': list(players),
+        'backend': backend,
+        'seed': seed,
+        'games': games,
+        'records': sum(shard['records'] for shard in shards),
+        'results': results,
+        'shards': shards,
+    }
+    if not write_config_atomic(manifest, os.path.join(folder, MANIFEST)):
+        raise OSError(f"Не удалось записать {MANIFEST} в {folder}")
+    return manifest, elapsed
+
+
+def load_manifest(folder):
+    with open(os.path.join(folder, MANIFEST), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('format') != FORMAT_VERSION:
+        raise ValueError(f"Неизвестная версия датасета: {manifest.get('format')}")
+    return manifest
+
+
+def open_shards(folder, manifest=None):
+    # Шарды как memmap-массивы только для чтения: данные подгружаются с диска по мере обращения
+    manifest = manifest or load_manifest(folder)
+    dtype = record_dtype(manifest['y_size'], manifest['x_size'])
+    for shard in manifest['shards']:
+        array = np.load(os.path.join(folder, shard['file']), mmap_mode='r')
+        if array.dtype != dtype or len(array) != shard['records']:
+            raise ValueError(f"Шард {shard['file']} не совпадает с {MANIFEST}")
+        yield array
+
+
+def iter_batches(folder, batch_size=65536):
+    # Срезы memmap — представления без копирования
+    for array in open_shards(folder):
+        for start in range(0, len(array), batch_size):
+            yield array[start:start + batch_size]
+
+
+def summarize(folder):
+    started = time.perf_counter()
+    records = wins = draws = 0
+    plies = 0
+    for batch in iter_batches(folder):
+        records += len(batch)
+        wins += int(np.count_nonzero(batch['outcome'] == 1))
+        draws += int(np.count_nonzero(batch['outcome'] == 0))
+        plies += int(batch['ply'].sum(dtype=np.int64))
+    elapsed = time.perf_counter() - started
+    lines = [
+        f"Позиций: {records}, у ходящего победа {100 * wins / max(records, 1):.1f}%, "
+        f"ничья {100 * draws / max(records, 1):.1f}%, средний номер хода {plies / max(records, 1):.2f}",
+        f"Чтение через memmap: {elapsed:.3f} с ({records / elapsed if elapsed else 0:.0f} позиций/с)",
+    ]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Датасет позиций из партий ботов в шардах .npy")
+    parser.add_argument("--out", default="dataset", help="папка для шардов и manifest.json")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--board", default="3x3", help="размер поля, например 3x3 или 15x15:5")
+    parser.add_argument("--backend", default="cells")
+    parser.add_argument("--player1", default="bot")
+    parser.add_argument("--player2", default="bot")
+    parser.add_argument("--time-limit", type=float, default=0.05)
+    parser.add_argument("--shard-records", type=int, default=1 << 20, help="записей в одном шарде")
+    parser.add_argument("--chunk-size", type=int, default=500, help="партий в одной задаче воркера")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--read", action="store_true", help="не играть, только прочитать готовый датасет")
+    args = parser.parse_args(argv)
+
+    if not args.read:
+        manifest, elapsed = generate(
+            args.out, args.games, parse_board(args.board), (args.player1, args.player2),
+            {'time_limit': args.time_limit}, args.backend, args.seed,
+            args.shard_records, args.chunk_size, args.workers
+        )
+        print(f"Партий: {manifest['games']} за {elapsed:.2f} с, позиций: {manifest['records']}, "
+              f"шардов: {len(manifest['shards'])}")
+    print(summarize(args.out))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# fonts.py
+# Шрифты без SysFont: поиск файла шрифта (перебор системных шрифтов через fc-list) делается
+# один раз, путь запоминается на диске, и следующие запуски сразу открывают нужный файл
+import json
+import os
+import pygame
+
+FONT_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "tic_tac_toe", "fonts.json")
+
+_paths = None
+_fonts = {}
+
+
+def _load_paths():
+    global _paths
+    if _paths is None:
+        try:
+            with open(FONT_CACHE, 'r', encoding='utf-8') as f:
+                _paths = json.load(f)
+        except (OSError, ValueError):
+            _paths = {}
+    return _paths
+
+
+def _save_paths():
+    try:
+        os.makedirs(os.path.dirname(FONT_CACHE), exist_ok=True)
+        tmp_filename = FONT_CACHE + ".tmp"
+        with open(tmp_filename, 'w', encoding='utf-8') as f:
+            json.dump(_paths, f, ensure_ascii=False)
+        os.replace(tmp_filename, FONT_CACHE)
+    except OSError:
+        pass
+
+
+def font_path(name, bold=False):
+    # Путь к файлу шрифта или None — тогда используется встроенный шрифт pygame
+    paths = _load_paths()
+    key = f"{name}|{int(bold)}"
+    if key in paths:
+        path = paths[key]
+        if path is None or os.path.exists(path):
+            return path
+    path = pygame.font.match_font(name, bold)
+    paths[key] = path
+    _save_paths()
+    return path
+
+
+def get_font(name, size, bold=False):
+    if not pygame.font.get_init():
+        # После pygame.quit() старые объекты Font недействительны
+        pygame.font.init()
+        _fonts.clear()
+    font = _fonts.get((name, size, bold))
+    if font is None:
+        path = font_path(name, bold)
+        font = pygame.font.Font(path, size)
+        if bold and path is None:
+            font.set_bold(True)
+        _fonts[(name, size, bold)] = font
+    return font
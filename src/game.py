@@ -1,37 +1,13 @@
 import pygame
-from .logic import Field
-from .players import HumanPlayer, BotPlayer
+from .logic import create_field
+from .players import HumanPlayer, BotPlayer, create_player
 import sys
 import os
 from .render import GameRenderer
-import json
-
-
-class ConfigLoader:
-    def __init__(self, filename="config.json"):
-        self.config = self._load_config(filename)
-
-    def _load_config(self, filename):
-        try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            print(f"Ошибка: Файл конфигурации '{filename}' не найден.")
-            sys.exit()
-        except json.JSONDecodeError:
-            print(f"Ошибка: Некорректный формат JSON в файле '{filename}'.")
-            sys.exit()
-
-    def get_field_size(self):
-        settings = self.config.get("field_settings", {})
-        return settings.get("y_size", 3), settings.get("x_size", 3)
-
-    def get_player_data(self, player_key):
-        return self.config.get(player_key, {})
-
-    def get_starting_player_symbol(self):
-        return self.config.get("starting_player_symbol", "X")
-
+from .save_writer import SaveWriter
+from .journal import JOURNAL_FILE, JournalError, MoveJournal
+from .bot_worker import BOT_MOVE_EVENT, BotWorker
+from .config_loader import ConfigLoader
 
 
 class Game:
@@ -40,6 +16,8 @@ class Game:
         config_loader = ConfigLoader()
         
         y_size, x_size = config_loader.get_field_size()
+        backend = config_loader.get_field_backend()
+        win_length = config_loader.get_win_length()
         p1_data = config_loader.get_player_data("player1_settings")
         p2_data = config_loader.get_player_data("player2_settings")
         
@@ -48,48 +26,145 @@ class Game:
         default_p2_type = p2_data.get('type', 'bot').lower()
         
         curr_p = config_loader.get_starting_player_symbol()
+        self.event_driven, self.fps = config_loader.get_loop_settings()
+        self.save_format = config_loader.get_save_format()
+        self.archive_settings = config_loader.get_archive_settings()
+        self.archive_writer = None
+        self.journal = None
+        # Ходы партии для архива и отмены; после загрузки из game_state.json история неизвестна — None
+        self.moves = []
+        self.redo_moves = []
+        # После продолжения из журнала ходы до контрольной точки читаются только по надобности
+        self.history_pending = False
         
-        if load_saved and os.path.exists("game_state.json"):
-            self.field = Field()
+        resumed = load_saved and os.path.exists(JOURNAL_FILE) and self._resume_journal(backend)
+        if resumed:
+            p1_name, p1_sym, p2_name, p2_sym, curr_p = resumed
+        elif load_saved and os.path.exists("game_state.json"):
+            self.field = create_field(backend=backend)
             loaded = self.field.load_config()
             if loaded:
                 p1_name, p1_sym, p2_name, p2_sym, curr_p = loaded
+                self.moves = None
             else:
-                self.field = Field(y_size, x_size)
+                self.field = create_field(y_size, x_size, backend, win_length)
                 p1_name, p1_sym = default_p1_name, default_p1_sym
                 p2_name, p2_sym = default_p2_name, default_p2_sym
         else:
-            self.field = Field(y_size, x_size)
+            self.field = create_field(y_size, x_size, backend, win_length)
             p1_name, p1_sym = default_p1_name, default_p1_sym
             p2_name, p2_sym = default_p2_name, default_p2_sym
 
         self.player1 = HumanPlayer(p1_name, p1_sym)
         
-        if default_p2_type == "bot":
-            self.player2 = BotPlayer(p2_name, p2_sym)
-        elif default_p2_type == "human":
-            self.player2 = HumanPlayer(p2_name, p2_sym)
-        else:
-            self.player2 = HumanPlayer(p2_name, p2_sym) 
+        self.player2 = create_player(default_p2_type, p2_name, p2_sym, p2_data)
 
         self.current_player = self.player1 if curr_p == p1_sym else self.player2
+        if not resumed:
+            self.first_index = 0 if self.current_player == self.player1 else 1
 
         self.game_over = False
         self.winner = None
 
         self.renderer = GameRenderer(self.field.x_size, self.field.y_size)
+        self.save_writer = SaveWriter()
+        self.bot_worker = BotWorker()
+        if self.save_format != "json" and self.journal is None:
+            self.journal = MoveJournal.create(
+                JOURNAL_FILE, self.field,
+                (self.player1.name, self.player2.name), (self.player1.symbol, self.player2.symbol),
+                0 if self.current_player == self.player1 else 1
+            )
+
+    def _resume_journal(self, backend):
+        # Продолжение из журнала: последняя контрольная точка + ходы после неё, без чтения всего файла.
+        # Порядок ходов до точки нужен только для отмены и архива — его читает _load_history
+        try:
+            journal = MoveJournal.open(JOURNAL_FILE)
+            self.field, current_index = journal.resume(backend)
+        except (OSError, JournalError):
+            return None
+        self.journal = journal
+        self.moves = None
+        self.history_pending = True
+        self.first_index = journal.starting_index
+        (p1_name, p2_name), (p1_sym, p2_sym) = journal.names, journal.symbols
+        return p1_name, p1_sym, p2_name, p2_sym, journal.symbols[current_index]
+
+    def _load_history(self):
+        # Один раз читаем журнал целиком и переигрываем партию по порядку: поле из контрольной точки
+        # заполнено по строкам, и unmake_move снимал бы с него не те камни
+        if not self.history_pending or self.journal is None:
+            return
+        self.history_pending = False
+        try:
+            history = self.journal.history()
+        except (OSError, JournalError) as e:
+            print(f"Не удалось прочитать историю ходов из журнала: {e}")
+            return
+        if self.game_over:
+            # Последний ход законченной партии в журнал не пишется
+            row, col = self.field.last_move
+            history.append((0 if self.current_player == self.player1 else 1, row * self.field.x_size + col + 1))
+        field = type(self.field)(self.field.y_size, self.field.x_size, self.field.win_length)
+        for player_index, position in history:
+            field.make_move(position, self.journal.symbols[player_index])
+        self.field = field
+        self.moves = [position for _, position in history]
+
+    def remove_saves(self):
+        self.save_writer.discard()
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+        for filename in ("game_state.json", JOURNAL_FILE):
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def close_saves(self):
+        self.save_writer.close()
+        # Пул процессов MCTS живёт, пока его не закрыть
+        self.player1.close()
+        self.player2.close()
+        if self.archive_writer is not None:
+            self.archive_writer.close()
+            self.archive_writer = None
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
 
     def switch_player(self):
         self.current_player = self.player2 if self.current_player == self.player1 else self.player1
 
     def check_game_state(self):
-        if self.field.has_winner(self.current_player.symbol):
+        if self.field.last_move_wins(self.current_player.symbol):
             self.game_over = True
             self.winner = self.current_player.name
         elif self.field.is_draw():
             self.game_over = True
             self.winner = None 
 
+    def archive_game(self):
+        # Партия попадает в архив, когда из неё выходят (перезапуск или закрытие окна), а не в момент
+        # победы: после Ctrl+Z и повторного конца партии в архиве иначе оказались бы две записи
+        if not self.archive_settings.get("enabled") or not self.game_over:
+            return
+        self._load_history()
+        if self.moves is None:
+            return
+        # После победы очередь не переходит: победитель — текущий игрок
+        winner = self.current_player.symbol if self.field.last_move_wins(self.current_player.symbol) else None
+        from .archive import ARCHIVE_FILE, ArchivedGame, ArchiveWriter
+        game = ArchivedGame(
+            self.field.y_size, self.field.x_size, self.field.win_length,
+            (self.player1.name, self.player2.name), (self.player1.symbol, self.player2.symbol),
+            self.first_index, self.moves, winner, "game"
+        )
+        # sqlite пишет фоновый поток, окно не ждёт диска
+        if self.archive_writer is None:
+            self.archive_writer = ArchiveWriter(self.archive_settings.get("path", ARCHIVE_FILE))
+        self.archive_writer.submit(game)
+
     def handle_click(self, mouse_pos):
         row, col = self.renderer.get_grid_coordinates(mouse_pos)
 
@@ -101,63 +176,151 @@ class Game:
 
         position = row * self.field.x_size + col + 1
 
-        if self.field.make_move(position, self.current_player.symbol):
-            self.check_game_state()
-            if not self.game_over:
-                self.switch_player()
-                self.field.save_config(
-                self.player1.name, self.player1.symbol,
-                self.player2.name, self.player2.symbol,
-                self.current_player.symbol
-            )
-                if isinstance(self.current_player, BotPlayer):
-                    pygame.time.set_timer(pygame.USEREVENT, 500)
-            
-    def make_bot_move(self):
-        move = self.current_player.get_move(self.field)
-        self.field.make_move(move, self.current_player.symbol)
+        if self.play_move(position) and not self.game_over:
+            if isinstance(self.current_player, BotPlayer):
+                self.start_bot_turn()
+
+    def play_move(self, position, redo=False):
+        if not self.field.make_move(position, self.current_player.symbol):
+            return False
+        if not redo:
+            # Новый ход вместо отменённых — повторять больше нечего
+            self.redo_moves.clear()
+        if self.moves is not None:
+            self.moves.append(position)
         self.check_game_state()
         if not self.game_over:
             self.switch_player()
-            self.field.save_config(
-            self.player1.name, self.player1.symbol,
-            self.player2.name, self.player2.symbol,
-            self.current_player.symbol
-        )
+            self.save_state()
+        return True
+
+    def undo_move(self):
+        # Отменяем ходы, пока очередь не вернётся к человеку: ответ бота снимается вместе с ходом,
+        # на который он отвечал. Расчёт бота, если он идёт, прерывается
+        if not self.moves and not self.history_pending:
+            return
+        self.bot_worker.cancel()
+        self._load_history()
+        while self.moves:
+            self._undo_last()
+            if not isinstance(self.current_player, BotPlayer):
+                break
+        if isinstance(self.current_player, BotPlayer):
+            self.start_bot_turn()
+
+    def _undo_last(self):
+        finished = self.game_over
+        position = self.moves.pop()
+        row, col = divmod(position - 1, self.field.x_size)
+        symbol = self.field.grid[row][col].symbol
+        self.field.unmake_move()
+        self.redo_moves.append(position)
+        self.current_player = self.player1 if symbol == self.player1.symbol else self.player2
+        self.game_over = False
+        self.winner = None
+
+        index = 0 if self.current_player == self.player1 else 1
+        if self.save_format == "json":
+            self.save_state()
+        elif not finished:
+            # Последний ход законченной партии в журнал не попадал — отменять его там не нужно
+            self.journal.append_undo(position, index, self.field, index)
+
+    def redo_move(self):
+        # Повторяем отменённые ходы до следующего хода человека, ответ бота — тот же, что был
+        if not self.redo_moves or self.game_over:
+            return
+        self.bot_worker.cancel()
+        while self.redo_moves and not self.game_over:
+            self.play_move(self.redo_moves.pop(), redo=True)
+            if not isinstance(self.current_player, BotPlayer):
+                break
+        if not self.game_over and isinstance(self.current_player, BotPlayer):
+            self.start_bot_turn()
+
+    def start_bot_turn(self):
+        # Бот думает в фоне, окно продолжает отвечать; ход придёт событием BOT_MOVE_EVENT
+        self.bot_worker.start(self.current_player, self.field)
+
+    def make_bot_move(self, move=None):
+        if move is None:
+            move = self.current_player.get_move(self.field)
+        self.play_move(move)
+
+    def save_state(self):
+        if self.save_format == "json":
+            self.save_writer.submit(self.field.get_config(
+                self.player1.name, self.player1.symbol,
+                self.player2.name, self.player2.symbol,
+                self.current_player.symbol
+            ))
+            return
+
+        # Журнал: дописываем только что сделанный ход (несколько байт), а не всё поле
+        next_index = 0 if self.current_player == self.player1 else 1
+        row, col = self.field.last_move
+        self.journal.append_move(row * self.field.x_size + col + 1, 1 - next_index, self.field, next_index)
 
     def run(self):
         if isinstance(self.current_player, BotPlayer):
-            self.make_bot_move()
+            self.start_bot_turn()
 
         clock = pygame.time.Clock()
         running = True
+        if self.event_driven:
+            # Движение мыши не используется — не будим цикл из-за него
+            pygame.event.set_blocked(pygame.MOUSEMOTION)
 
         while running:
-            for event in pygame.event.get():
+            dirty = self.renderer.draw(self.field, self.game_over, self.winner, self.current_player)
+            if dirty:
+                pygame.display.update(dirty)
+            clock.tick(self.fps)
+
+            if self.event_driven:
+                # Спим до следующего события: клика, клавиши или таймера хода бота
+                events = [pygame.event.wait()] + pygame.event.get()
+            else:
+                events = pygame.event.get()
+
+            for event in events:
                 if event.type == pygame.QUIT:
                     running = False
 
-                if not self.game_over and event.type == pygame.MOUSEBUTTONDOWN:
+                if self.renderer.handle_view_event(event):
+                    continue
+
+                if not self.game_over and event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                     if isinstance(self.current_player, HumanPlayer):
                         self.handle_click(event.pos)
 
-                if event.type == pygame.USEREVENT:
-                    pygame.time.set_timer(pygame.USEREVENT,0)
+                if event.type == BOT_MOVE_EVENT and self.bot_worker.is_current(event):
+                    self.bot_worker.finish()
                     if not self.game_over and isinstance(self.current_player,BotPlayer):
-                        self.make_bot_move() 
+                        self.make_bot_move(event.move)
                 
                 if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_r and self.game_over:
-                        if os.path.exists("game_state.json"):
-                            os.remove("game_state.json")
+                    if event.key == pygame.K_r:
+                        # Перезапуск в любой момент: расчёт бота прерывается
+                        self.bot_worker.cancel()
+                        self.archive_game()
+                        self.remove_saves()
+                        self.close_saves()
                         new_game = Game()
                         new_game.run()
                         return
+                    if event.mod & pygame.KMOD_CTRL:
+                        # Ctrl+Z — отменить ход, Ctrl+Y или Ctrl+Shift+Z — вернуть
+                        if event.key == pygame.K_z and not event.mod & pygame.KMOD_SHIFT:
+                            self.undo_move()
+                        elif event.key in (pygame.K_y, pygame.K_z):
+                            self.redo_move()
 
-            self.renderer.draw(self.field, self.game_over, self.winner, self.current_player)
-            
-            pygame.display.flip()
-            clock.tick(60)
+                if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                    self.renderer.invalidate()
 
+        self.bot_worker.cancel()
+        self.archive_game()
+        self.close_saves()
         pygame.quit()
         sys.exit()
\ No newline at end of file
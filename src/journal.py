@@ -0,0 +1,224 @@
+# journal.py
+# Журнал партии: заголовок, затем блоки "контрольная точка + K записей ходов" фиксированного размера.
+#
+# Заголовок (little-endian):
+#   magic b"TTTJ", версия (B), y_size (H), x_size (H), win_length (H, 0 — классические правила),
+#   K — ходов между контрольными точками (H), индекс начинающего игрока (B),
+#   затем имя и символ каждого из двух игроков: длина (H) + UTF-8.
+# Запись хода — 4 байта: тип (B, 1 — ход, 3 — отмена хода, 0 — пустая), индекс игрока (B), позиция 1..x*y (H).
+# После отмены хода блок добивается пустыми записями и пишется контрольная точка с полем без этого хода,
+# так что при продолжении партии после контрольной точки встречаются только обычные ходы.
+# Контрольная точка: тип (B, 2), индекс игрока, который ходит следующим (B),
+#   затем поле по 2 бита на клетку (0 — пусто, 1 — игрок 1, 2 — игрок 2).
+# Так как все записи фиксированного размера, последняя контрольная точка находится
+# по размеру файла, без чтения всего журнала.
+import argparse
+import os
+import struct
+from .logic import Display, create_field
+
+JOURNAL_FILE = "game_state.journal"
+MAGIC = b"TTTJ"
+VERSION = 1
+HEADER = struct.Struct("<4sBHHHHB")
+MOVE = struct.Struct("<BBH")
+CHECKPOINT_HEAD = struct.Struct("<BB")
+RECORD_PAD, RECORD_MOVE, RECORD_CHECKPOINT, RECORD_UNDO = 0, 1, 2, 3
+
+
+class JournalError(Exception):
+    pass
+
+
+def _pack_string(text):
+    data = text.encode('utf-8')
+    return struct.pack("<H", len(data)) + data
+
+
+def _read_string(f):
+    raw = f.read(2)
+    if len(raw) != 2:
+        raise JournalError("Обрезанный заголовок журнала")
+    (length,) = struct.unpack("<H", raw)
+    data = f.read(length)
+    if len(data) != length:
+        raise JournalError("Обрезанный заголовок журнала")
+    return data.decode('utf-8')
+
+
+def pack_board(field, symbols):
+    codes = {symbols[0]: 1, symbols[1]: 2}
+    packed = bytearray((field.x_size * field.y_size + 3) // 4)
+    index = 0
+    for row in field.grid:
+        for cell in row:
+            code = codes.get(cell.symbol, 0)
+            if code:
+                packed[index >> 2] |= code << ((index & 3) * 2)
+            index += 1
+    return bytes(packed)
+
+
+def unpack_board(field, data, symbols):
+    for index in range(field.x_size * field.y_size):
+        code = data[index >> 2] >> ((index & 3) * 2) & 3
+        if code:
+            field.make_move(index + 1, symbols[code - 1])
+
+
+class MoveJournal:
+    def __init__(self, path, y_size, x_size, win_length, names, symbols, starting_index,
+                 checkpoint_every, data_start):
+        self.path = path
+        self.y_size = y_size
+        self.x_size = x_size
+        self.win_length = win_length
+        self.names = names
+        self.symbols = symbols
+        self.starting_index = starting_index
+        self.checkpoint_every = checkpoint_every
+        self.data_start = data_start
+        self.checkpoint_size = CHECKPOINT_HEAD.size + (x_size * y_size + 3) // 4
+        self.block_size = self.checkpoint_size + checkpoint_every * MOVE.size
+        self.since_checkpoint = 0
+        self.file = None
+
+    @classmethod
+    def create(cls, path, field, names, symbols, current_index, checkpoint_every=32):
+        header = HEADER.pack(
+            MAGIC, VERSION, field.y_size, field.x_size, field.win_length or 0,
+            checkpoint_every, current_index
+        )
+        header += b"".join(_pack_string(text) for pair in zip(names, symbols) for text in pair)
+
+        journal = cls(path, field.y_size, field.x_size, field.win_length, names, symbols,
+                      current_index, checkpoint_every, len(header))
+        journal.file = open(path, 'wb')
+        journal.file.write(header)
+        journal._write_checkpoint(field, current_index)
+        journal.file.flush()
+        return journal
+
+    @classmethod
+    def open(cls, path):
+        with open(path, 'rb') as f:
+            raw = f.read(HEADER.size)
+            if len(raw) != HEADER.size:
+                raise JournalError(f"Файл '{path}' не является журналом")
+            magic, version, y_size, x_size, win_length, checkpoint_every, starting_index = HEADER.unpack(raw)
+            if magic != MAGIC or version != VERSION:
+                raise JournalError(f"Файл '{path}': неизвестный формат или версия {version}")
+            p1_name, p1_sym, p2_name, p2_sym = (_read_string(f) for _ in range(4))
+            data_start = f.tell()
+        return cls(path, y_size, x_size, win_length or None, (p1_name, p2_name), (p1_sym, p2_sym),
+                   starting_index, checkpoint_every, data_start)
+
+    def _layout(self):
+        # Возвращает (смещение последней целой контрольной точки, число ходов после неё)
+        size = os.path.getsize(self.path) - self.data_start
+        blocks, rest = divmod(size, self.block_size)
+        if rest >= self.checkpoint_size:
+            return self.data_start + blocks * self.block_size, (rest - self.checkpoint_size) // MOVE.size
+        if blocks == 0:
+            raise JournalError(f"Журнал '{self.path}' не содержит ни одной контрольной точки")
+        return self.data_start + (blocks - 1) * self.block_size, self.checkpoint_every
+
+    def resume(self, backend="cells", for_append=True):
+        # Восстанавливаем поле из последней контрольной точки и доигрываем ходы после неё
+        checkpoint, moves = self._layout()
+        field = create_field(self.y_size, self.x_size, backend, self.win_length)
+        with open(self.path, 'rb') as f:
+            f.seek(checkpoint)
+            record_type, current_index = CHECKPOINT_HEAD.unpack(f.read(CHECKPOINT_HEAD.size))
+            if record_type != RECORD_CHECKPOINT:
+                raise JournalError(f"Журнал '{self.path}' повреждён")
+            unpack_board(field, f.read(self.checkpoint_size - CHECKPOINT_HEAD.size), self.symbols)
+            for _ in range(moves):
+                record_type, player_index, position = MOVE.unpack(f.read(MOVE.size))
+                if record_type == RECORD_MOVE:
+                    field.make_move(position, self.symbols[player_index])
+                    current_index = 1 - player_index
+
+        if for_append:
+            # Обрезаем недописанную запись и продолжаем дописывать в конец
+            valid_end = checkpoint + self.checkpoint_size + moves * MOVE.size
+            self.file = open(self.path, 'r+b')
+            self.file.truncate(valid_end)
+            self.file.seek(valid_end)
+            self.since_checkpoint = moves
+            if moves >= self.checkpoint_every:
+                self._write_checkpoint(field, current_index)
+                self.file.flush()
+        return field, current_index
+
+    def append_move(self, position, player_index, field, next_index):
+        self.file.write(MOVE.pack(RECORD_MOVE, player_index, position))
+        self.since_checkpoint += 1
+        if self.since_checkpoint >= self.checkpoint_every:
+            self._write_checkpoint(field, next_index)
+        self.file.flush()
+
+    def append_undo(self, position, player_index, field, next_index):
+        # field — уже без отменённого хода; player_index — кто сделал отменённый ход
+        self.file.write(MOVE.pack(RECORD_UNDO, player_index, position))
+        self.since_checkpoint += 1
+        padding = self.checkpoint_every - self.since_checkpoint
+        if padding > 0:
+            self.file.write(MOVE.pack(RECORD_PAD, 0, 0) * padding)
+        self._write_checkpoint(field, next_index)
+        self.file.flush()
+
+    def _write_checkpoint(self, field, next_index):
+        self.file.write(CHECKPOINT_HEAD.pack(RECORD_CHECKPOINT, next_index))
+        self.file.write(pack_board(field, self.symbols))
+        self.since_checkpoint = 0
+
+    def history(self):
+        # Все ходы партии с начала журнала без отменённых: [(индекс игрока, позиция), ...]
+        moves = []
+        with open(self.path, 'rb') as f:
+            f.seek(self.data_start)
+            while True:
+                head = f.read(1)
+                if not head:
+                    break
+                if head[0] == RECORD_CHECKPOINT:
+                    if len(f.read(self.checkpoint_size - 1)) != self.checkpoint_size - 1:
+                        break
+                    continue
+                rest = f.read(MOVE.size - 1)
+                if len(rest) != MOVE.size - 1:
+                    break
+                record_type, player_index, position = MOVE.unpack(head + rest)
+                if record_type == RECORD_MOVE:
+                    moves.append((player_index, position))
+                elif record_type == RECORD_UNDO and moves:
+                    moves.pop()
+        return moves
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Просмотр журнала партии")
+    parser.add_argument("path", nargs="?", default=JOURNAL_FILE)
+    args = parser.parse_args(argv)
+
+    journal = MoveJournal.open(args.path)
+    Display.draw(f"Поле {journal.y_size}x{journal.x_size}: "
+                 f"{journal.names[0]} ({journal.symbols[0]}) против {journal.names[1]} ({journal.symbols[1]})")
+    for number, (player_index, position) in enumerate(journal.history(), 1):
+        row, col = divmod(position - 1, journal.x_size)
+        Display.draw(f"{number}. {journal.names[player_index]}: строка {row + 1}, столбец {col + 1}")
+
+    field, current_index = journal.resume(for_append=False)
+    for row in field.grid:
+        Display.draw("|".join(cell.draw() for cell in row))
+    Display.draw(f"Ходит: {journal.names[current_index]}")
+
+
+if __name__ == "__main__":
+    main()
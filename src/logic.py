@@ -1,11 +1,31 @@
 # logic.py
 import json
 import os
+import sys
+from array import array
+
+
+def write_config_atomic(config, filename):
+    # Пишем во временный файл и подменяем им сохранение: при сбое остаётся старая целая версия
+    tmp_filename = filename + ".tmp"
+    try:
+        with open(tmp_filename, 'w', encoding='utf-8') as f:
+            json.dump(config, f, separators=(',', ':'), ensure_ascii=False)
+            # Данные должны лечь на диск раньше, чем rename: иначе после сбоя питания файл может оказаться пустым
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_filename, filename)
+        return True
+    except Exception as e:
+        return False
 
 
 class Cell:
+    # __slots__ и интернированный символ: клетка — это объект с одной ссылкой, без словаря атрибутов
+    __slots__ = ('symbol',)
+
     def __init__(self, symbol=" "):
-        self.symbol = symbol
+        self.symbol = sys.intern(symbol)
 
     def draw(self):
         return self.symbol
@@ -15,11 +35,19 @@ class Cell:
 
     def set_symbol(self, new_symbol):
         if self.is_empty():
-            self.symbol = new_symbol
+            self.symbol = sys.intern(new_symbol)
             return True
         return False
 
 
+class SharedCell(Cell):
+    # Клетка-приспособленец: одна на символ и общая для многих полей, поэтому менять её нельзя
+    __slots__ = ()
+
+    def set_symbol(self, new_symbol):
+        return False
+
+
 class Display:  
     @staticmethod 
     def draw(content): 
@@ -27,11 +55,185 @@ class Display:
 
 
 
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+def required_run_lengths(y_size, x_size, win_length=None):
+    # Длина ряда для победы по каждому направлению; 0 — направление не участвует
+    if win_length:
+        return (win_length,) * len(DIRECTIONS)
+    diagonal = x_size if x_size == y_size else 0
+    return (x_size, y_size, diagonal, diagonal)
+
+
+class LineRunIndex:
+    # Индекс серий по направлениям: в концах каждой серии хранится индекс противоположного конца,
+    # поэтому ход сливает соседние серии за O(1) на направление, без сканирования линий.
+    # Откат хода (remove) тоже O(1): концы бывших соседних серий восстанавливаются по соседям клетки.
+    # Символы не копируются — индекс читает их из сетки поля; концы серий всех направлений лежат
+    # в одном плоском array('i') (ends[d * total + index]), а на ход запоминаются только победы
+    __slots__ = ('grid', 'y_size', 'x_size', 'total', 'need', 'ends', 'winners', 'last_winner', 'placed', 'wins')
+
+    def __init__(self, grid, y_size, x_size, win_length=None):
+        self.grid = grid
+        self.y_size = y_size
+        self.x_size = x_size
+        self.total = y_size * x_size
+        self.need = required_run_lengths(y_size, x_size, win_length)
+        self.ends = array('i', bytes(4 * len(DIRECTIONS) * self.total))
+        self.winners = set()
+        self.last_winner = None
+        self.placed = 0
+        self.wins = []      # (номер хода, символ, добавлен ли он этим ходом в winners)
+
+    def place(self, row, col, symbol):
+        # Символ уже стоит в сетке
+        y_size = self.y_size
+        x_size = self.x_size
+        grid = self.grid
+        ends = self.ends
+        index = row * x_size + col
+
+        won = False
+        for d, (dr, dc) in enumerate(DIRECTIONS):
+            base = d * self.total
+            start = end = index
+
+            r, c = row - dr, col - dc
+            if 0 <= r < y_size and 0 <= c < x_size and grid[r][c].symbol == symbol:
+                start = ends[base + r * x_size + c]
+            r, c = row + dr, col + dc
+            if 0 <= r < y_size and 0 <= c < x_size and grid[r][c].symbol == symbol:
+                end = ends[base + r * x_size + c]
+
+            ends[base + start] = end
+            ends[base + end] = start
+
+            need = self.need[d]
+            if need and not won:
+                length = 1 if start == end else (end - start) // (dr * x_size + dc) + 1
+                won = length >= need
+
+        self.placed += 1
+        if won:
+            self.wins.append((self.placed, symbol, symbol not in self.winners))
+            self.winners.add(symbol)
+            self.last_winner = symbol
+        else:
+            self.last_winner = None
+        return won
+
+    def remove(self, row, col):
+        # Откат последнего place, пока символ ещё стоит в сетке. Вдоль направления индексы клеток растут,
+        # поэтому по значению в конце соседней серии видно, был ли сосед одиночной клеткой
+        # (тогда там теперь дальний конец общей серии)
+        y_size = self.y_size
+        x_size = self.x_size
+        grid = self.grid
+        ends = self.ends
+        index = row * x_size + col
+        symbol = grid[row][col].symbol
+        for d, (dr, dc) in enumerate(DIRECTIONS):
+            base = d * self.total
+            r, c = row - dr, col - dc
+            if 0 <= r < y_size and 0 <= c < x_size and grid[r][c].symbol == symbol:
+                left = r * x_size + c
+                start = ends[base + left]
+                if start >= index:
+                    start = left
+                ends[base + start] = left
+                ends[base + left] = start
+            r, c = row + dr, col + dc
+            if 0 <= r < y_size and 0 <= c < x_size and grid[r][c].symbol == symbol:
+                right = r * x_size + c
+                end = ends[base + right]
+                if end <= index:
+                    end = right
+                ends[base + end] = right
+                ends[base + right] = end
+
+        wins = self.wins
+        if wins and wins[-1][0] == self.placed:
+            _, _, added = wins.pop()
+            if added:
+                self.winners.discard(symbol)
+        self.placed -= 1
+        self.last_winner = wins[-1][1] if wins and wins[-1][0] == self.placed else None
+
+
+class FreeCells:
+    # Свободные клетки для выбора хода за O(1): плотный массив items и место каждой клетки в нём (places).
+    # remove ставит на место удалённой последнюю клетку; restore в порядке, обратном удалениям,
+    # возвращает массив ровно в прежний вид — этим пользуются поиск и доигровки (сделать ход / отменить)
+    __slots__ = ('items', 'places')
+
+    def __init__(self, items, size):
+        self.items = array('i', items)
+        self.places = array('i', [-1]) * size
+        for place, item in enumerate(self.items):
+            self.places[item] = place
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __contains__(self, item):
+        place = self.places[item]
+        return 0 <= place < len(self.items) and self.items[place] == item
+
+    def remove(self, item):
+        items = self.items
+        place = self.places[item]
+        last = items[-1]
+        items[place] = last
+        self.places[last] = place
+        items.pop()
+        # places[item] остаётся прежним: по нему restore вернёт клетку на её место
+        self.places[item] = place
+
+    def restore(self, item):
+        items = self.items
+        place = self.places[item]
+        if place == len(items):
+            items.append(item)
+        else:
+            moved = items[place]
+            self.places[moved] = len(items)
+            items.append(moved)
+            items[place] = item
+
+    def sample(self, rng):
+        return self.items[rng.randrange(len(self.items))]
+
+
+def free_positions(total_cells):
+    # Все позиции 1..total_cells свободны; places[0] не используется
+    return FreeCells(range(1, total_cells + 1), total_cells + 1)
+
+
 class Field:
-    def __init__(self,y_size = 3,x_size = 3):
+    # version растёт на 1 при каждом ходе и его отмене, last_change — клетка, изменённая последней:
+    # по ним окно перерисовывает одну клетку, а не всё поле
+    __slots__ = ('y_size', 'x_size', 'win_length', 'grid', 'runs', 'last_move', 'last_change', 'version',
+                 'free_cells', 'history')
+
+    def __init__(self,y_size = 3,x_size = 3, win_length=None):
         self.y_size = y_size
         self.x_size = x_size
+        self.win_length = win_length
+        self._reset()
+
+    def _reset(self):
         self.grid = [[Cell() for _ in range(self.x_size)] for _ in range(self.y_size)]
+        self.runs = LineRunIndex(self.grid, self.y_size, self.x_size, self.win_length)
+        self.free_cells = free_positions(self.x_size * self.y_size)
+        # Только позиции ходов: прежний last_move — это предыдущая позиция
+        self.history = array('i')
+        self.last_move = None
+        self.last_change = None
+        self.version = 0
 
     def make_move(self, position, player):
         total_cells = self.x_size * self.y_size
@@ -47,41 +249,64 @@ class Field:
 
         cell = self.grid[row][col]
         if cell.set_symbol(player):
+            self.history.append(position)
+            self.last_move = self.last_change = (row, col)
+            self.runs.place(row, col, player)
+            self.free_cells.remove(position)
+            self.version += 1
             return True
         else:
             return False
 
-    def has_winner(self, player):
-        n = self.x_size
-        m = self.y_size
+    def unmake_move(self):
+        # Отмена последнего хода за O(1): клетка, серии, победители и свободные клетки — как до хода.
+        # Возвращает отменённую позицию или None, если отменять нечего
+        if not self.history:
+            return None
+        history = self.history
+        position = history.pop()
+        row, col = divmod(position - 1, self.x_size)
+        self.runs.remove(row, col)
+        self._clear_cell(row, col)
+        self.free_cells.restore(position)
+        self.last_move = divmod(history[-1] - 1, self.x_size) if history else None
+        self.last_change = (row, col)
+        self.version += 1
+        return position
 
-        for row in self.grid:
-            if all(cell.symbol == player for cell in row):
-                return True
+    def _clear_cell(self, row, col):
+        self.grid[row][col].symbol = " "
 
-        for col in range(n):
-            if all(self.grid[row][col].symbol == player for row in range(m)):
-                return True
+    def has_winner(self, player):
+        return player in self.runs.winners
 
-        if n == m:
-            if all(self.grid[i][i].symbol == player for i in range(n)):
-                return True
-            if all(self.grid[i][n - 1 - i].symbol == player for i in range(n)):
-                return True
-
-        return False
+    def last_move_wins(self, player):
+        return self.runs.last_winner == player
 
     def is_draw(self):
+        return not self.free_cells
+
+    def random_free_position(self, rng):
+        # Случайная свободная позиция за O(1) или None, если поле заполнено
+        return self.free_cells.sample(rng) if self.free_cells else None
+
+    def snapshot(self):
+        # Независимая копия позиции на битовых масках: её читает поток бота, пока окно может отменять ходы
+        copy = BitField(self.y_size, self.x_size, self.win_length)
+        position = 1
         for row in self.grid:
             for cell in row:
-                if cell.is_empty():
-                    return False
-        return True
+                if not cell.is_empty():
+                    copy.make_move(position, cell.symbol)
+                position += 1
+        copy.last_move = self.last_move
+        return copy
 
     def get_config(self, p1_name, p1_sym, p2_name, p2_sym, current_p):
         return {
             'x_size': self.x_size,
             'y_size': self.y_size,
+            'win_length': self.win_length,
             'grid': [[cell.symbol for cell in row] for row in self.grid],
             'player1': {'name': p1_name, 'symbol': p1_sym},
             'player2': {'name': p2_name, 'symbol': p2_sym},
@@ -89,11 +314,7 @@ class Field:
         }
 
     def save_config(self, p1_name, p1_sym, p2_name, p2_sym, current_p, filename="game_state.json"):
-        try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(self.get_config(p1_name, p1_sym, p2_name, p2_sym, current_p), f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            return False
+        return write_config_atomic(self.get_config(p1_name, p1_sym, p2_name, p2_sym, current_p), filename)
 
     def load_config(self, filename="game_state.json"):
         try:
@@ -102,7 +323,8 @@ class Field:
 
             self.x_size = config['x_size']
             self.y_size = config['y_size']
-            self.grid = [[Cell(config['grid'][i][j]) for j in range(self.x_size)] for i in range(self.y_size)]
+            self.win_length = config.get('win_length')
+            self._load_grid(config['grid'])
 
             return (
                 config['player1']['name'], config['player1']['symbol'],
@@ -112,4 +334,251 @@ class Field:
         except FileNotFoundError:
             return False
         except Exception as e:
-            return None
\ No newline at end of file
+            return None
+
+    def _load_grid(self, symbols):
+        self._reset()
+        for i in range(self.y_size):
+            for j in range(self.x_size):
+                if symbols[i][j] != " ":
+                    self.make_move(i * self.x_size + j + 1, symbols[i][j])
+
+
+class _BitRow:
+    # Строка поля BitField: отдаёт общие (только для чтения) Cell по символу
+    def __init__(self, field, row):
+        self.field = field
+        self.offset = row * field.x_size
+
+    def __len__(self):
+        return self.field.x_size
+
+    def __getitem__(self, col):
+        if col < 0 or col >= self.field.x_size:
+            raise IndexError(col)
+        return _cell_for(self.field.symbol_at(self.offset + col))
+
+    def __iter__(self):
+        for col in range(self.field.x_size):
+            yield _cell_for(self.field.symbol_at(self.offset + col))
+
+
+class _BitGrid:
+    def __init__(self, field):
+        self.field = field
+
+    def __len__(self):
+        return self.field.y_size
+
+    def __getitem__(self, row):
+        if row < 0 or row >= self.field.y_size:
+            raise IndexError(row)
+        return _BitRow(self.field, row)
+
+    def __iter__(self):
+        for row in range(self.field.y_size):
+            yield _BitRow(self.field, row)
+
+
+_SHARED_CELLS = {}
+
+
+def _cell_for(symbol):
+    cell = _SHARED_CELLS.get(symbol)
+    if cell is None:
+        cell = _SHARED_CELLS[symbol] = SharedCell(symbol)
+    return cell
+
+
+class CompactField(Field):
+    # Сетка из общих клеток SharedCell: в поле хранятся только ссылки, а не отдельный Cell на клетку
+    __slots__ = ()
+
+    def _reset(self):
+        empty = _cell_for(" ")
+        self.grid = [[empty] * self.x_size for _ in range(self.y_size)]
+        self.runs = LineRunIndex(self.grid, self.y_size, self.x_size, self.win_length)
+        self.free_cells = free_positions(self.x_size * self.y_size)
+        self.history = array('i')
+        self.last_move = None
+        self.last_change = None
+        self.version = 0
+
+    def make_move(self, position, player):
+        if position < 1 or position > self.x_size * self.y_size:
+            return False
+
+        row, col = divmod(position - 1, self.x_size)
+        grid_row = self.grid[row]
+        if not grid_row[col].is_empty():
+            return False
+        grid_row[col] = _cell_for(player)
+        self.history.append(position)
+        self.last_move = self.last_change = (row, col)
+        self.runs.place(row, col, player)
+        self.free_cells.remove(position)
+        self.version += 1
+        return True
+
+    def _clear_cell(self, row, col):
+        self.grid[row][col] = _cell_for(" ")
+
+
+def build_cell_lines(y_size, x_size, lines):
+    # Для каждой клетки — список масок линий, через которые она проходит
+    cell_lines = [[] for _ in range(y_size * x_size)]
+    for mask in lines:
+        rest = mask
+        while rest:
+            low = rest & -rest
+            cell_lines[low.bit_length() - 1].append(mask)
+            rest ^= low
+    return cell_lines
+
+
+def build_line_masks(y_size, x_size, win_length=None):
+    # Все выигрышные отрезки: для каждого направления — окна нужной длины внутри поля
+    lines = []
+    for (dr, dc), need in zip(DIRECTIONS, required_run_lengths(y_size, x_size, win_length)):
+        if not need:
+            continue
+        for row in range(y_size):
+            for col in range(x_size):
+                end_r = row + dr * (need - 1)
+                end_c = col + dc * (need - 1)
+                if not (0 <= end_r < y_size and 0 <= end_c < x_size):
+                    continue
+                mask = 0
+                for i in range(need):
+                    mask |= 1 << ((row + dr * i) * x_size + col + dc * i)
+                lines.append(mask)
+    return lines
+
+
+_LINE_TABLES = {}
+
+
+def shared_line_tables(y_size, x_size, win_length=None):
+    # Маски линий зависят только от размеров и правила — одна копия на все поля такого вида
+    key = (y_size, x_size, win_length)
+    tables = _LINE_TABLES.get(key)
+    if tables is None:
+        lines = build_line_masks(y_size, x_size, win_length)
+        cell_lines = tuple(tuple(masks) for masks in build_cell_lines(y_size, x_size, lines))
+        tables = _LINE_TABLES[key] = (tuple(lines), cell_lines)
+    return tables
+
+
+class BitField(Field):
+    # Поле на битовых масках: по одному int на символ игрока, grid — представление только для чтения
+    __slots__ = ('total_cells', 'boards', 'occupied', 'moves_count', 'lines', 'cell_lines',
+                 'winners', 'last_winner', 'wins')
+
+    def _reset(self):
+        self.total_cells = self.x_size * self.y_size
+        self.boards = {}
+        self.occupied = 0
+        self.moves_count = 0
+        self.lines, self.cell_lines = shared_line_tables(self.y_size, self.x_size, self.win_length)
+        self.free_cells = free_positions(self.total_cells)
+        # Как у Field: позиции ходов в array('i'), символ берётся из масок, а победы — из короткого списка wins
+        self.history = array('i')
+        self.winners = set()
+        self.last_winner = None
+        self.wins = []      # (номер хода, символ, добавлен ли он этим ходом в winners)
+        self.last_move = None
+        self.last_change = None
+        self.version = 0
+
+    @property
+    def grid(self):
+        return _BitGrid(self)
+
+    def snapshot(self):
+        copy = BitField(self.y_size, self.x_size, self.win_length)
+        for symbol, board in self.boards.items():
+            while board:
+                low = board & -board
+                copy.make_move(low.bit_length(), symbol)
+                board ^= low
+        copy.last_move = self.last_move
+        return copy
+
+    def symbol_at(self, index):
+        bit = 1 << index
+        if not self.occupied & bit:
+            return " "
+        for symbol, board in self.boards.items():
+            if board & bit:
+                return symbol
+        return " "
+
+    def make_move(self, position, player):
+        if position < 1 or position > self.total_cells:
+            return False
+
+        bit = 1 << (position - 1)
+        if self.occupied & bit:
+            return False
+
+        board = self.boards.get(player, 0) | bit
+        self.boards[player] = board
+        self.occupied |= bit
+        self.moves_count += 1
+        self.free_cells.remove(position)
+        self.last_move = self.last_change = divmod(position - 1, self.x_size)
+        self.version += 1
+        self.history.append(position)
+
+        self.last_winner = None
+        for mask in self.cell_lines[position - 1]:
+            if board & mask == mask:
+                self.wins.append((self.moves_count, player, player not in self.winners))
+                self.winners.add(player)
+                self.last_winner = player
+                break
+        return True
+
+    def unmake_move(self):
+        if not self.history:
+            return None
+        history = self.history
+        position = history.pop()
+        bit = 1 << (position - 1)
+        for player, board in self.boards.items():
+            if board & bit:
+                break
+        self.boards[player] = board ^ bit
+        self.occupied ^= bit
+        self.free_cells.restore(position)
+        wins = self.wins
+        if wins and wins[-1][0] == self.moves_count:
+            _, _, added = wins.pop()
+            if added:
+                self.winners.discard(player)
+        self.moves_count -= 1
+        self.last_winner = wins[-1][1] if wins and wins[-1][0] == self.moves_count else None
+        self.last_move = divmod(history[-1] - 1, self.x_size) if history else None
+        self.last_change = divmod(position - 1, self.x_size)
+        self.version += 1
+        return position
+
+    def has_winner(self, player):
+        return player in self.winners
+
+    def last_move_wins(self, player):
+        return self.last_winner == player
+
+    def is_draw(self):
+        return not self.free_cells
+
+
+FIELD_BACKENDS = {
+    "cells": Field,
+    "compact": CompactField,
+    "bitboard": BitField,
+}
+
+
+def create_field(y_size=3, x_size=3, backend="cells", win_length=None):
+    return FIELD_BACKENDS.get(backend, Field)(y_size, x_size, win_length)
\ No newline at end of file
@@ -1,19 +1,25 @@
 import pygame
 import sys
 import os
+from .journal import JOURNAL_FILE
+from .fonts import get_font
 
 class MainMenu:
-    def __init__(self):
-        pygame.init()
+    def __init__(self, event_driven=True, fps=60):
+        # Только нужные модули: pygame.init() поднимает ещё звук, джойстики и прочее, что игре не нужно
+        pygame.display.init()
+        pygame.font.init()
+        self.event_driven = event_driven
+        self.fps = fps
         self.screen = pygame.display.set_mode((340, 380))
         pygame.display.set_caption("Крестики-нолики — Меню")
 
-        self.title_font = pygame.font.SysFont("Arial", 36, bold=True)
-        self.menu_font = pygame.font.SysFont("Arial", 24, bold=True)
-        self.small_font = pygame.font.SysFont("Arial", 14,bold=True)
+        self.title_font = get_font("Arial", 36, bold=True)
+        self.menu_font = get_font("Arial", 24, bold=True)
+        self.small_font = get_font("Arial", 14, bold=True)
 
         self.menu_items = ["Новая игра", "Продолжить", "Правила", "Выход"]
-        self.continue_true = os.path.exists("game_state.json")
+        self.continue_true = os.path.exists("game_state.json") or os.path.exists(JOURNAL_FILE)
 
     def show_rules(self):
         rules = [
@@ -21,56 +27,83 @@ class MainMenu:
             "",
             "1. Игроки по очереди ставят символ (X или O)",
             "",
-            "2. Нажмите R для перезапуска после игры",
+            "2. Нажмите R для перезапуска игры",
             "",
             "Нажмите где угодно, чтобы закрыть"
         ]
 
+        clock = pygame.time.Clock()
         running = True
+        redraw = True
         while running:
-            self.screen.fill((170, 110, 70))
-            y = 50
-            for line in rules:
-                text = self.small_font.render(line, True, (255, 255, 255))
-                x = self.screen.get_width() // 2 - text.get_width() // 2
-                self.screen.blit(text, (x, y))
-                y += 30
-
-            pygame.display.flip()
-
-            for event in pygame.event.get():
+            if redraw or not self.event_driven:
+                self.screen.fill((170, 110, 70))
+                y = 50
+                for line in rules:
+                    text = self.small_font.render(line, True, (255, 255, 255))
+                    x = self.screen.get_width() // 2 - text.get_width() // 2
+                    self.screen.blit(text, (x, y))
+                    y += 30
+
+                pygame.display.flip()
+                redraw = False
+            clock.tick(self.fps)
+
+            for event in self.get_events():
+                if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                    redraw = True
                 if event.type in (pygame.MOUSEBUTTONDOWN, pygame.QUIT):
                     running = False
                     if event.type == pygame.QUIT:
                         pygame.quit()
                         sys.exit()
 
-    def run(self):
-        clock = pygame.time.Clock()
-        while True:
-            self.screen.fill((170, 110, 70))
+    def get_events(self):
+        if self.event_driven:
+            # Меню статично: спим до следующего события вместо опроса каждый кадр
+            return [pygame.event.wait()] + pygame.event.get()
+        return pygame.event.get()
+
+    def draw_menu(self):
+        self.screen.fill((170, 110, 70))
 
-            title = self.title_font.render("Крестики-нолики", True, (255, 255, 255))
-            self.screen.blit(title, (self.screen.get_width() // 2 - title.get_width() // 2, 30))
+        title = self.title_font.render("Крестики-нолики", True, (255, 255, 255))
+        self.screen.blit(title, (self.screen.get_width() // 2 - title.get_width() // 2, 30))
 
-            item_rects = []
-            for i, item in enumerate(self.menu_items):
-                color = (150, 150, 150) if (i == 1 and not self.continue_true) else (255, 255, 255)
-                text = self.menu_font.render(item, True, color)
-                x = self.screen.get_width() // 2 - text.get_width() // 2
-                y = 120 + i * 60
-                self.screen.blit(text, (x, y))
+        item_rects = []
+        for i, item in enumerate(self.menu_items):
+            color = (150, 150, 150) if (i == 1 and not self.continue_true) else (255, 255, 255)
+            text = self.menu_font.render(item, True, color)
+            x = self.screen.get_width() // 2 - text.get_width() // 2
+            y = 120 + i * 60
+            self.screen.blit(text, (x, y))
 
-                rect = text.get_rect(topleft=(x, y))
-                rect.height = 40
-                item_rects.append(rect)
+            rect = text.get_rect(topleft=(x, y))
+            rect.height = 40
+            item_rects.append(rect)
+
+        panel_height = 40
+        pygame.draw.rect(self.screen, (255, 255, 255), (0, 340, 340, panel_height))
+
+        pygame.display.flip()
+        return item_rects
+
+    def run(self):
+        clock = pygame.time.Clock()
+        if self.event_driven:
+            pygame.event.set_blocked(pygame.MOUSEMOTION)
+        redraw = True
+        while True:
+            if redraw or not self.event_driven:
+                item_rects = self.draw_menu()
+                redraw = False
 
-            panel_height = 40
-            pygame.draw.rect(self.screen, (255, 255, 255), (0, 340, 340, panel_height))
+            clock.tick(self.fps)
 
-            pygame.display.flip()
+            for event in self.get_events():
+                if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                    redraw = True
 
-            for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     pygame.quit()
                     sys.exit()
@@ -82,16 +115,17 @@ class MainMenu:
                             continue
                         if rect.collidepoint(mouse_pos):
                             if i == 0:
-                                if os.path.exists("game_state.json"):
-                                    os.remove("game_state.json")
+                                for filename in ("game_state.json", JOURNAL_FILE):
+                                    if os.path.exists(filename):
+                                        os.remove(filename)
                                 return "new"
                             elif i == 1:
                                 return "continue"
                             elif i == 2:
                                 self.show_rules()
+                                redraw = True
                                 break
                             elif i == 3:
                                 pygame.quit()
                                 sys.exit()
 
-            clock.tick(60)
@@ -0,0 +1,264 @@
+# mcts.py
+# Поиск Монте-Карло по дереву (UCT) для больших полей, где полный перебор невозможен
+import argparse
+import math
+import os
+import random
+import time
+from .logic import FreeCells, build_line_masks, build_cell_lines
+
+
+class MCTSNode:
+    __slots__ = ('move', 'parent', 'player', 'children', 'untried', 'visits', 'wins', 'result')
+
+    def __init__(self, move, parent, player, untried, result=None):
+        self.move = move
+        self.parent = parent
+        self.player = player      # кто сделал ход move (0 — ходящий в корне)
+        self.children = {}
+        self.untried = untried
+        self.visits = 0
+        self.wins = 0.0
+        self.result = result      # None — партия продолжается, иначе победитель (0/1) или -1 при ничьей
+
+
+class MCTSSearch:
+    def __init__(self, y_size, x_size, win_length=None, exploration=1.4, seed=None):
+        self.y_size = y_size
+        self.x_size = x_size
+        self.win_length = win_length
+        self.total_cells = y_size * x_size
+        self.cell_lines = build_cell_lines(y_size, x_size, build_line_masks(y_size, x_size, win_length))
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.root = None
+        self.root_boards = None
+        self.playouts = 0
+
+    def is_win(self, board, index):
+        for mask in self.cell_lines[index]:
+            if board & mask == mask:
+                return True
+        return False
+
+    def free_cells(self, occupied):
+        return [i for i in range(self.total_cells) if not occupied >> i & 1]
+
+    def _reuse_root(self, me, opp):
+        # Переиспользуем дерево: спускаемся на наш прошлый ход и ответ соперника
+        if self.root is not None:
+            root_me, root_opp = self.root_boards
+            my_new = me & ~root_me
+            opp_new = opp & ~root_opp
+            if (me & root_me == root_me and opp & root_opp == root_opp
+                    and my_new.bit_count() == 1 and opp_new.bit_count() == 1):
+                child = self.root.children.get(my_new.bit_length() - 1)
+                grandchild = child.children.get(opp_new.bit_length() - 1) if child else None
+                if grandchild is not None:
+                    # Через два хода ходящий в корне тот же, поэтому метки игроков в поддереве верны
+                    grandchild.parent = None
+                    self.root = grandchild
+                    self.root_boards = (me, opp)
+                    return
+        self.root = MCTSNode(None, None, 1, self.free_cells(me | opp))
+        self.root_boards = (me, opp)
+
+    def search(self, me, opp, iterations=2000, time_limit=0.4, cancel=None):
+        self._reuse_root(me, opp)
+        root = self.root
+        # time_limit=None — только бюджет в итерациях, и ход не зависит от скорости машины
+        deadline = time.perf_counter() + time_limit if time_limit is not None else None
+        rng = self.rng
+        log = math.log
+        sqrt = math.sqrt
+        c = self.exploration
+        # Свободные клетки корня: по ходу итерации клетки удаляются, в конце возвращаются в обратном порядке
+        free = FreeCells(self.free_cells(me | opp), self.total_cells)
+        played = []
+
+        done = 0
+        while done < iterations:
+            if done & 63 == 0:
+                if deadline is not None and time.perf_counter() > deadline:
+                    break
+                if cancel is not None and cancel.is_set():
+                    break
+            done += 1
+
+            node = root
+            boards = [me, opp]
+            turn = 0
+
+            # Выбор: спускаемся по UCT, пока узел полностью раскрыт
+            while not node.untried and node.children and node.result is None:
+                log_visits = log(node.visits)
+                best = None
+                best_value = -1.0
+                for child in node.children.values():
+                    value = child.wins / child.visits + c * sqrt(log_visits / child.visits)
+                    if value > best_value:
+                        best_value = value
+                        best = child
+                node = best
+                boards[turn] |= 1 << node.move
+                free.remove(node.move)
+                played.append(node.move)
+                turn ^= 1
+
+            # Раскрытие одного нового хода
+            if node.result is None and node.untried:
+                untried = node.untried
+                pick = rng.randrange(len(untried))
+                untried[pick], untried[-1] = untried[-1], untried[pick]
+                move = untried.pop()
+                boards[turn] |= 1 << move
+                free.remove(move)
+                played.append(move)
+                if self.is_win(boards[turn], move):
+                    result = turn
+                elif not free:
+                    result = -1
+                else:
+                    result = None
+                child = MCTSNode(move, node, turn, list(free) if result is None else [], result)
+                node.children[move] = child
+                node = child
+                turn ^= 1
+
+            # Случайная доигровка прямо на битовых масках, без копий поля
+            winner = node.result
+            if winner is None:
+                order = list(free)
+                rng.shuffle(order)
+                winner = -1
+                for index in order:
+                    board = boards[turn] | 1 << index
+                    boards[turn] = board
+                    if self.is_win(board, index):
+                        winner = turn
+                        break
+                    turn ^= 1
+            while played:
+                free.restore(played.pop())
+
+            # Обратное распространение
+            while node is not None:
+                node.visits += 1
+                if winner == node.player:
+                    node.wins += 1.0
+                elif winner == -1:
+                    node.wins += 0.5
+                node = node.parent
+
+        self.playouts += done
+        return {move: (child.visits, child.wins) for move, child in root.children.items()}, done
+
+
+_STOP = None
+
+
+def _init_worker(stop):
+    # Событие остановки передаётся процессу при запуске: через submit его не передать
+    global _STOP
+    _STOP = stop
+
+
+def _search_worker(task):
+    # Корневое распараллеливание: каждый процесс строит своё дерево от той же позиции
+    y_size, x_size, win_length, exploration, me, opp, iterations, time_limit, seed = task
+    search = MCTSSearch(y_size, x_size, win_length, exploration, seed)
+    return search.search(me, opp, iterations, time_limit, _STOP)
+
+
+class MCTSPlayerEngine:
+    def __init__(self, y_size, x_size, win_length=None, exploration=1.4, workers=0, seed=None):
+        self.search = MCTSSearch(y_size, x_size, win_length, exploration, seed)
+        self.workers = workers
+        self.pool = None
+        self.stop = None
+        self.seed_rng = random.Random(seed)
+        self.stats = {'playouts': 0, 'elapsed': 0.0, 'playouts_per_sec': 0.0}
+
+    def _start_pool(self):
+        # Пул нужен только при workers > 0 — не тянем multiprocessing в каждый импорт ядра.
+        # spawn, а не fork: ход считается в фоновом потоке окна, и копировать процесс с живыми потоками
+        # (и pygame) небезопасно
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        context = multiprocessing.get_context("spawn")
+        self.stop = context.Event()
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                        initializer=_init_worker, initargs=(self.stop,))
+
+    def best_move(self, me, opp, iterations=2000, time_limit=0.4, cancel=None):
+        # iterations — на весь ход: делятся между своим поиском и процессами пула
+        started = time.perf_counter()
+        futures = []
+        own_iterations = iterations
+        if self.workers:
+            if self.pool is None:
+                self._start_pool()
+            self.stop.clear()
+            share = iterations // (self.workers + 1)
+            own_iterations = iterations - share * self.workers
+            search = self.search
+            for _ in range(self.workers):
+                task = (search.y_size, search.x_size, search.win_length, search.exploration,
+                        me, opp, share, time_limit, self.seed_rng.getrandbits(32))
+                futures.append(self.pool.submit(_search_worker, task))
+
+        totals, playouts = self.search.search(me, opp, own_iterations, time_limit, cancel)
+        totals = dict(totals)
+        if futures:
+            from concurrent.futures import wait
+            pending = futures
+            while pending:
+                # Отмену хода передаём процессам, а не ждём их до конца лимита времени
+                if cancel is not None and cancel.is_set():
+                    self.stop.set()
+                _, pending = wait(pending, timeout=0.02)
+        for future in futures:
+            stats, done = future.result()
+            playouts += done
+            for move, (visits, wins) in stats.items():
+                old_visits, old_wins = totals.get(move, (0, 0.0))
+                totals[move] = (old_visits + visits, old_wins + wins)
+
+        elapsed = time.perf_counter() - started
+        self.stats = {
+            'playouts': playouts,
+            'elapsed': elapsed,
+            'playouts_per_sec': playouts / elapsed if elapsed else 0.0,
+        }
+        if not totals:
+            free = self.search.free_cells(me | opp)
+            return free[0] if free else None
+        return max(totals, key=lambda move: totals[move][0])
+
+    def close(self):
+        if self.pool is not None:
+            self.stop.set()
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замер скорости MCTS: доигровок в секунду с пустого поля")
+    parser.add_argument("--y-size", type=int, default=7)
+    parser.add_argument("--x-size", type=int, default=7)
+    parser.add_argument("--win-length", type=int, default=4)
+    parser.add_argument("--iterations", type=int, default=1000000)
+    parser.add_argument("--time-limit", type=float, default=2.0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() - 1)
+    args = parser.parse_args(argv)
+
+    engine = MCTSPlayerEngine(args.y_size, args.x_size, args.win_length, workers=args.workers)
+    move = engine.best_move(0, 0, args.iterations, args.time_limit)
+    engine.close()
+    stats = engine.stats
+    print(f"Ход: {move + 1}, доигровок: {stats['playouts']} за {stats['elapsed']:.2f} с "
+          f"({stats['playouts_per_sec']:.0f}/с, процессов: {args.workers + 1})")
+
+
+if __name__ == "__main__":
+    main()
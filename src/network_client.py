@@ -0,0 +1,224 @@
+# network_client.py
+# Тонкий клиент: поле и правила живут на сервере (src/server.py), окно только отправляет клики
+# и рисует ходы, которые подтвердил сервер
+import json
+import socket
+import sys
+import threading
+import pygame
+from .logic import Display, create_field
+from .players import HumanPlayer, RemotePlayer
+from .render import GameRenderer
+
+NET_EVENT = pygame.event.custom_type()
+
+
+class NetworkClient:
+    def __init__(self, host, port, event_type=NET_EVENT, timeout=5.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.event_type = event_type
+        # Номер сессии и токен своего места из "joined": без токена сервер не вернёт в начатую партию
+        self.session = None
+        self.token = None
+        self.name = None
+        self.thread = None
+        self._connect()
+
+    def _connect(self):
+        self.sock = socket.create_connection((self.host, self.port), self.timeout)
+        self.sock.settimeout(None)
+        self.reader = self.sock.makefile('r', encoding='utf-8')
+        self.closed = False
+
+    def send(self, message):
+        self.sock.sendall((json.dumps(message, ensure_ascii=False) + "\n").encode('utf-8'))
+
+    def receive(self):
+        try:
+            line = self.reader.readline()
+        except OSError:
+            return None
+        return json.loads(line) if line else None
+
+    def join(self, message):
+        # Отправляет join и ждёт ответа; при успехе запоминает сессию и токен для переподключения
+        self.name = message.get("name")
+        self.send(message)
+        joined = self.receive()
+        if joined is None or joined.get("event") != "joined":
+            self.close()
+            raise ConnectionError(joined.get("message") if joined else "Сервер закрыл соединение")
+        self.session = joined["session"]
+        self.token = joined["token"]
+        return joined
+
+    def reconnect(self):
+        # Новое соединение и возвращение на своё место в той же сессии
+        self.close()
+        self._connect()
+        return self.join({"cmd": "join", "name": self.name, "session": self.session, "token": self.token})
+
+    def start(self):
+        # Сообщения сервера читаются в фоне и приходят в игровой цикл событиями NET_EVENT
+        def listen():
+            while True:
+                message = self.receive()
+                if self.closed:
+                    # Соединение закрыли мы сами (выход или перезапуск) — окно уже не ждёт событий
+                    return
+                if message is None:
+                    pygame.event.post(pygame.event.Event(self.event_type, message={"event": "closed"}))
+                    return
+                pygame.event.post(pygame.event.Event(self.event_type, message=message))
+
+        self.thread = threading.Thread(target=listen, name="network-client", daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.closed = True
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+class NetworkGame:
+    def __init__(self, host, port, name, session=None, y_size=3, x_size=3, win_length=None,
+                 event_driven=True, fps=60, symbol=None, token=None):
+        self.settings = dict(host=host, port=port, name=name, y_size=y_size, x_size=x_size,
+                             win_length=win_length, event_driven=event_driven, fps=fps)
+        self.event_driven = event_driven
+        self.fps = fps
+
+        self.client = NetworkClient(host, port)
+        joined = self.client.join({"cmd": "join", "name": name, "session": session, "token": token,
+                                   "symbol": symbol, "y_size": y_size, "x_size": x_size,
+                                   "win_length": win_length})
+
+        self.session = joined["session"]
+        self.load_board(joined)
+        # Номер сессии и токен нужны, чтобы вернуться в партию с другого запуска (network_settings)
+        Display.draw(f"Сессия {self.session}, токен места: {self.client.token}")
+        self.player = HumanPlayer(name, joined["symbol"])
+        self.opponent = RemotePlayer("ожидание соперника", "O" if self.player.symbol == "X" else "X")
+        self.current_player = self.opponent
+        self.game_over = False
+        self.winner = None
+        self.message = None
+
+        self.renderer = GameRenderer(self.field.x_size, self.field.y_size)
+        pygame.display.set_caption(f"Крестики-нолики — сессия {self.session}")
+        self.client.start()
+
+    def load_board(self, joined):
+        self.field = create_field(joined["y_size"], joined["x_size"], win_length=joined["win_length"])
+        # При возвращении в начатую партию сервер присылает уже сделанные ходы
+        for position, move_symbol in joined.get("moves", []):
+            self.field.make_move(position, move_symbol)
+
+    def reconnect(self):
+        # Связь оборвалась посреди партии: возвращаемся на своё место по токену
+        try:
+            joined = self.client.reconnect()
+        except (OSError, ValueError):
+            return False
+        self.load_board(joined)
+        self.renderer.invalidate()
+        self.client.start()
+        return True
+
+    @classmethod
+    def from_config(cls, config_loader):
+        network = config_loader.get_network_settings()
+        y_size, x_size = config_loader.get_field_size()
+        name = config_loader.get_player_data("player1_settings").get('name', 'Игрок 1')
+        return cls(network.get("host", "127.0.0.1"), network.get("port", 8765), name,
+                   network.get("session"), y_size, x_size, config_loader.get_win_length(),
+                   *config_loader.get_loop_settings(), network.get("symbol"), network.get("token"))
+
+    def handle_click(self, mouse_pos):
+        row, col = self.renderer.get_grid_coordinates(mouse_pos)
+
+        if row is None or col is None:
+            return
+
+        if row < 0 or row >= self.field.y_size or col < 0 or col >= self.field.x_size:
+            return
+
+        # Ход ставится только после ответа сервера, поэтому поле у обоих игроков одинаковое
+        self.client.send({"cmd": "move", "position": row * self.field.x_size + col + 1})
+
+    def handle_message(self, message):
+        event = message.get("event")
+        if event == "start":
+            for data in message["players"]:
+                if data["symbol"] == self.opponent.symbol:
+                    self.opponent.name = data["name"]
+            self.current_player = self.player if message["current"] == self.player.symbol else self.opponent
+            self.message = None
+        elif event == "move":
+            self.field.make_move(message["position"], message["symbol"])
+            self.current_player = self.player if message["current"] == self.player.symbol else self.opponent
+            if message["winner"]:
+                self.game_over = True
+                self.winner = self.player.name if message["winner"] == self.player.symbol else self.opponent.name
+            elif message["draw"]:
+                self.game_over = True
+        elif event == "left":
+            # Сессия сохраняется на сервере: соперник может вернуться по её номеру
+            if not self.game_over:
+                self.message = f"{message['name']} отключился, ждём"
+        elif event == "closed":
+            if not self.game_over and not self.reconnect():
+                self.game_over = True
+                self.message = "Нет связи с сервером"
+        elif event == "error":
+            Display.draw(f"Сервер: {message['message']}")
+
+    def run(self):
+        clock = pygame.time.Clock()
+        running = True
+        if self.event_driven:
+            pygame.event.set_blocked(pygame.MOUSEMOTION)
+
+        while running:
+            dirty = self.renderer.draw(self.field, self.game_over, self.winner, self.current_player, self.message)
+            if dirty:
+                pygame.display.update(dirty)
+            clock.tick(self.fps)
+
+            if self.event_driven:
+                events = [pygame.event.wait()] + pygame.event.get()
+            else:
+                events = pygame.event.get()
+
+            for event in events:
+                if event.type == pygame.QUIT:
+                    running = False
+
+                if self.renderer.handle_view_event(event):
+                    continue
+
+                if not self.game_over and event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                    if self.current_player is self.player and self.message is None:
+                        self.handle_click(event.pos)
+
+                if event.type == NET_EVENT:
+                    self.handle_message(event.message)
+
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_r:
+                    # Новая партия: отключаемся и снова встаём в очередь на сервере
+                    self.client.close()
+                    new_game = NetworkGame(**self.settings)
+                    new_game.run()
+                    return
+
+                if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                    self.renderer.invalidate()
+
+        self.client.close()
+        pygame.quit()
+        sys.exit()
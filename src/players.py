@@ -1,10 +1,16 @@
 # players.py
 import random
+import sys
 from .logic import Display
+from .search import get_engine
+from .tablebase import TablebaseError, default_path, load_tablebase
+from .mcts import MCTSPlayerEngine
 
 class Player:
+    __slots__ = ('name', 'symbol')
+
     def __init__(self, name, symbol):
-        self.symbol = symbol
+        self.symbol = sys.intern(symbol)
         self.name = name
 
     def get_name(self):
@@ -13,30 +19,184 @@ class Player:
     def get_symbol(self):
         return self.symbol
 
-    def get_move(self, field):
+    def get_move(self, field, cancel=None):
         raise NotImplementedError("Метод должен быть реализован в подклассах")
 
+    def close(self):
+        # Освободить ресурсы игрока (процессы, файлы) — вызывается при выходе из партии
+        pass
+
     def draw_info(self):
         Display.draw(f"Игрок: {self.name} ({self.symbol})")
 
 
 
 class HumanPlayer(Player):
+    __slots__ = ()
+
     def __init__(self, name, symbol):
         super().__init__(name, symbol)
     
-    def get_move(self, field):
+    def get_move(self, field, cancel=None):
+        return None
+
+
+
+class RemotePlayer(Player):
+    # Соперник по сети: его ходы приходят от сервера
+    __slots__ = ()
+
+    def __init__(self, name, symbol):
+        super().__init__(name, symbol)
+
+    def get_move(self, field, cancel=None):
         return None
 
 
 
 class BotPlayer(Player):
-    def get_move(self, field):
-        free_positions = []
-        total_cells = field.x_size * field.y_size
-        for pos in range(1, total_cells + 1):
-            row = (pos - 1) // field.x_size
-            col = (pos - 1) % field.x_size
-            if field.grid[row][col].symbol == " ":
-                free_positions.append(pos)
-        return random.choice(free_positions) if free_positions else 1
\ No newline at end of file
+    __slots__ = ('rng',)
+
+    def __init__(self, name, symbol, rng=None):
+        super().__init__(name, symbol)
+        self.rng = rng or random
+
+    def get_move(self, field, cancel=None):
+        # Поле само ведёт множество свободных клеток — без обхода сетки на каждом ходу
+        position = field.random_free_position(self.rng)
+        return position if position is not None else 1
+
+
+def field_bitboards(field, symbol):
+    # Поле как две битовые маски: свои камни и камни соперника
+    me = opp = 0
+    index = 0
+    for row in field.grid:
+        for cell in row:
+            if cell.symbol == symbol:
+                me |= 1 << index
+            elif cell.symbol != " ":
+                opp |= 1 << index
+            index += 1
+    return me, opp
+
+
+class MinimaxBotPlayer(BotPlayer):
+    __slots__ = ('time_limit', 'max_nodes')
+
+    def __init__(self, name, symbol, time_limit=0.4, rng=None, max_nodes=None):
+        super().__init__(name, symbol, rng)
+        self.time_limit = time_limit
+        self.max_nodes = max_nodes
+
+    def get_move(self, field, cancel=None):
+        me, opp = field_bitboards(field, self.symbol)
+        engine = get_engine(field.y_size, field.x_size, field.win_length)
+        move = engine.best_move(me, opp, self.time_limit, cancel, self.max_nodes)
+        return move + 1 if move is not None else 1
+
+
+
+class TablebaseBotPlayer(MinimaxBotPlayer):
+    # Ходы из готовой таблицы (python -m src.tablebase); если таблицы для поля нет — обычный перебор
+    __slots__ = ('path', 'table', 'table_key')
+
+    def __init__(self, name, symbol, path=None, time_limit=0.4, rng=None, max_nodes=None):
+        super().__init__(name, symbol, time_limit, rng, max_nodes)
+        self.path = path
+        self.table = None
+        self.table_key = None
+
+    def _get_table(self, field):
+        key = (field.y_size, field.x_size, field.win_length)
+        if key != self.table_key:
+            self.table_key = key
+            self.table = None
+            path = self.path or default_path(*key)
+            try:
+                self.table = load_tablebase(path, *key)
+            except (OSError, TablebaseError) as e:
+                Display.draw(f"Таблица не загружена: {e}")
+        return self.table
+
+    def get_move(self, field, cancel=None):
+        table = self._get_table(field)
+        if table is None:
+            return super().get_move(field, cancel)
+
+        mine = []
+        counts = {True: 0, False: 0}
+        for row in field.grid:
+            for cell in row:
+                if cell.symbol == " ":
+                    mine.append(None)
+                else:
+                    is_mine = cell.symbol == self.symbol
+                    mine.append(is_mine)
+                    counts[is_mine] += 1
+
+        # Первый игрок (код 1) ходит, когда камней поровну
+        my_code, opp_code = (1, 2) if counts[True] == counts[False] else (2, 1)
+        codes = [0 if m is None else my_code if m else opp_code for m in mine]
+        entry = table.lookup(codes)
+        if entry is None:
+            return super().get_move(field, cancel)
+        return entry[1] + 1
+
+
+
+class MCTSBotPlayer(BotPlayer):
+    __slots__ = ('iterations', 'time_limit', 'workers', 'exploration', 'engine', 'engine_key')
+
+    def __init__(self, name, symbol, iterations=2000, time_limit=0.4, workers=0, exploration=1.4, rng=None):
+        super().__init__(name, symbol, rng)
+        self.iterations = iterations
+        self.time_limit = time_limit
+        self.workers = workers
+        self.exploration = exploration
+        self.engine = None
+        self.engine_key = None
+
+    def get_move(self, field, cancel=None):
+        # Дерево живёт между ходами, пока не поменялись размер поля или правило победы
+        key = (field.y_size, field.x_size, field.win_length)
+        if key != self.engine_key:
+            if self.engine is not None:
+                self.engine.close()
+            seed = self.rng.getrandbits(32)
+            self.engine = MCTSPlayerEngine(*key, self.exploration, self.workers, seed)
+            self.engine_key = key
+
+        me, opp = field_bitboards(field, self.symbol)
+        move = self.engine.best_move(me, opp, self.iterations, self.time_limit, cancel)
+        return move + 1 if move is not None else 1
+
+    @property
+    def stats(self):
+        return self.engine.stats if self.engine is not None else {}
+
+    def close(self):
+        if self.engine is not None:
+            self.engine.close()
+            self.engine = None
+            self.engine_key = None
+
+
+def create_player(player_type, name, symbol, settings=None, rng=None):
+    settings = settings or {}
+    player_type = (player_type or "bot").lower()
+    if player_type == "bot":
+        return BotPlayer(name, symbol, rng)
+    elif player_type == "minimax":
+        return MinimaxBotPlayer(name, symbol, settings.get('time_limit', 0.4), rng, settings.get('max_nodes'))
+    elif player_type == "mcts":
+        return MCTSBotPlayer(
+            name, symbol, settings.get('iterations', 2000), settings.get('time_limit', 0.4),
+            settings.get('workers', 0), settings.get('exploration', 1.4), rng
+        )
+    elif player_type == "tablebase":
+        return TablebaseBotPlayer(
+            name, symbol, settings.get('tablebase'), settings.get('time_limit', 0.4), rng, settings.get('max_nodes')
+        )
+    else:
+        return HumanPlayer(name, symbol)
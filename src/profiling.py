@@ -0,0 +1,227 @@
+# profiling.py
+# Замеры горячих мест по запросу. Пока enable() не вызван, методы не обёрнуты вообще,
+# поэтому выключенные замеры ничего не стоят. enable() подменяет методы классов обёртками
+# с таймером, disable() возвращает оригиналы.
+import atexit
+import functools
+import importlib
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+
+# (модуль, класс, метод, считать ли отдельно вызовы, вернувшие False)
+# Только то, что игра действительно вызывает: сохранение идёт через фоновый SaveWriter
+# или журнал ходов, а не через Field.save_config
+TARGETS = (
+    ("logic", "Field", "make_move", True),
+    ("logic", "Field", "last_move_wins", False),
+    ("logic", "Field", "is_draw", False),
+    ("save_writer", "SaveWriter", "_write", True),
+    ("journal", "MoveJournal", "append_move", False),
+    ("journal", "MoveJournal", "append_undo", False),
+    ("players", "BotPlayer", "get_move", False),
+    ("render", "GameRenderer", "draw", False),
+)
+# Модули окна оборачиваются, только если уже импортированы: enable() сам pygame не подгружает
+GUI_MODULES = ("render",)
+
+
+class Metric:
+    __slots__ = ('count', 'total', 'samples', 'seen')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.samples = []
+        self.seen = 0
+
+
+class Profiler:
+    def __init__(self, max_samples=100000, trace=False, max_events=1000000, overlay=False):
+        self.max_samples = max_samples
+        self.trace = trace
+        self.show_overlay = overlay
+        self.max_events = max_events
+        self.metrics = {}
+        self.counters = {}
+        self.events = []
+        self.rng = random.Random(0)
+        self.started = time.perf_counter_ns()
+        self.lock = threading.Lock()
+
+    def record(self, name, start, duration):
+        # Замеры приходят и из потока бота, и из главного: выборка и события меняются только под замком
+        with self.lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics.setdefault(name, Metric())
+            metric.count += 1
+            metric.total += duration
+            # Выборка ограничена по размеру: после заполнения — резервуарная замена (Algorithm R)
+            metric.seen += 1
+            if len(metric.samples) < self.max_samples:
+                metric.samples.append(duration)
+            else:
+                slot = self.rng.randrange(metric.seen)
+                if slot < self.max_samples:
+                    metric.samples[slot] = duration
+            if self.trace and len(self.events) < self.max_events:
+                self.events.append((name, start, duration, threading.get_ident()))
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def stats(self):
+        result = {}
+        with self.lock:
+            metrics = [(name, metric.count, metric.total, sorted(metric.samples))
+                       for name, metric in sorted(self.metrics.items())]
+        for name, count, total, samples in metrics:
+            result[name] = {
+                'count': count,
+                'total_ms': total / 1e6,
+                'mean_us': total / count / 1e3,
+                'p50_us': percentile(samples, 50) / 1e3,
+                'p95_us': percentile(samples, 95) / 1e3,
+                'p99_us': percentile(samples, 99) / 1e3,
+            }
+        return result
+
+    def report(self):
+        lines = [f"{'метод':<28} {'вызовов':>9} {'всего, мс':>10} {'p50, мкс':>9} {'p95, мкс':>9} {'p99, мкс':>9}"]
+        for name, item in self.stats().items():
+            lines.append(f"{name:<28} {item['count']:>9} {item['total_ms']:>10.1f} "
+                         f"{item['p50_us']:>9.1f} {item['p95_us']:>9.1f} {item['p99_us']:>9.1f}")
+        with self.lock:
+            counters = sorted(self.counters.items())
+        for name, value in counters:
+            lines.append(f"{name:<28} {value:>9}")
+        return "\n".join(lines)
+
+    def overlay(self, methods=("make_move", "get_move", "draw")):
+        # Короткая строка для панели окна: p95 самых интересных замеров
+        parts = []
+        for name, item in self.stats().items():
+            method = name.rsplit(".", 1)[1]
+            if method in methods:
+                parts.append(f"{method} {item['p95_us']:.0f}")
+        return "p95, мкс: " + "  ".join(parts) if parts else ""
+
+    def dump_json(self, path):
+        metrics = self.stats()
+        with self.lock:
+            counters = dict(self.counters)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'metrics': metrics, 'counters': counters}, f, ensure_ascii=False, indent=2)
+
+    def dump_chrome_trace(self, path):
+        # Формат chrome://tracing и Perfetto: события "X" с началом и длительностью в микросекундах
+        pid = os.getpid()
+        with self.lock:
+            recorded = list(self.events)
+            counters = list(self.counters.items())
+        events = [
+            {"name": name, "ph": "X", "ts": (start - self.started) / 1e3, "dur": duration / 1e3,
+             "pid": pid, "tid": tid}
+            for name, start, duration, tid in recorded
+        ]
+        events += [{"name": name, "ph": "C", "ts": 0, "pid": pid, "args": {"value": value}}
+                   for name, value in counters]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def dump(self, path, fmt="json"):
+        if fmt == "chrome":
+            self.dump_chrome_trace(path)
+        else:
+            self.dump_json(path)
+
+
+def percentile(samples, q):
+    # samples уже отсортированы; метод "ближайшего ранга"
+    if not samples:
+        return 0.0
+    return samples[max(0, math.ceil(q / 100 * len(samples)) - 1)]
+
+
+PROFILER = None
+_patched = []
+
+
+def _wrap(cls, attr, name, count_false, active):
+    # active — общий для всей иерархии флаг потока: подкласс, вызывающий super().get_move,
+    # засчитывается один раз, под именем самого производного класса
+    original = cls.__dict__[attr]
+    clock = time.perf_counter_ns
+
+    @functools.wraps(original)
+    def timed(*args, **kwargs):
+        profiler = PROFILER
+        if profiler is None or getattr(active, 'depth', 0):
+            return original(*args, **kwargs)
+        active.depth = 1
+        start = clock()
+        try:
+            result = original(*args, **kwargs)
+        finally:
+            active.depth = 0
+            profiler.record(name, start, clock() - start)
+        if count_false and result is False:
+            profiler.count(name + ".false")
+        return result
+
+    setattr(cls, attr, timed)
+    _patched.append((cls, attr, original))
+
+
+def _subclasses(cls):
+    found = [cls]
+    for sub in cls.__subclasses__():
+        found.extend(_subclasses(sub))
+    return found
+
+
+def enable(trace=False, output=None, fmt="json", overlay=False, max_samples=100000):
+    # Оборачиваем метод в каждом классе иерархии, где он определён (BitField.make_move и т. д.)
+    global PROFILER
+    if PROFILER is not None:
+        return PROFILER
+    PROFILER = Profiler(max_samples, trace, overlay=overlay)
+
+    for module_name, class_name, attr, count_false in TARGETS:
+        full_name = f"{__package__}.{module_name}"
+        if module_name in GUI_MODULES and full_name not in sys.modules:
+            continue
+        module = importlib.import_module(full_name)
+        active = threading.local()
+        for cls in _subclasses(getattr(module, class_name)):
+            if attr in cls.__dict__:
+                _wrap(cls, attr, f"{cls.__name__}.{attr}", count_false, active)
+
+    if output:
+        profiler = PROFILER
+        atexit.register(profiler.dump, output, fmt)
+    return PROFILER
+
+
+def disable():
+    global PROFILER
+    while _patched:
+        cls, attr, original = _patched.pop()
+        setattr(cls, attr, original)
+    PROFILER = None
+
+
+def is_enabled():
+    return PROFILER is not None
+
+
+def count(name, amount=1):
+    # Счётчик для произвольного места кода; без включённых замеров — одна проверка на None
+    if PROFILER is not None:
+        PROFILER.count(name, amount)
@@ -1,46 +1,256 @@
+import time
 import pygame
+from . import profiling
+from .fonts import get_font
 
 
 class GameRenderer:
     def __init__(self, x_size, y_size):
-        self.cell_size = 100
-        self.margin = 10
+        self.base_cell_size = 100
+        self.min_cell_size = 8
+        self.max_cell_size = 200
         self.x_size = x_size
         self.y_size = y_size
-        
-        self.width = self.x_size * (self.cell_size + self.margin) + self.margin
-        self.height = self.y_size * (self.cell_size + self.margin) + self.margin + 40
-        
+        # Строка замеров под статусом, если включены замеры с overlay (см. src/profiling.py)
+        self.overlay = profiling.PROFILER is not None and profiling.PROFILER.show_overlay
+        self.overlay_text = ""
+        self.overlay_time = 0.0
+        self.panel_height = 58 if self.overlay else 40
+
+        # Окно может открываться без меню (например, из тестового скрипта) — поднимаем только дисплей
+        if not pygame.display.get_init():
+            pygame.display.init()
+
+        # Окно подгоняется под экран: клетки уменьшаются, а если поле всё равно не помещается —
+        # показывается его часть, которую можно двигать и масштабировать
+        max_width, max_height = self._available_size()
+        self.cell_size = self._fit_cell_size(max_width, max_height - self.panel_height)
+        board_width, board_height = self.board_size()
+        self.width = max(min(board_width, max_width), 200)
+        self.height = min(board_height, max_height - self.panel_height) + self.panel_height
+
         self.screen = pygame.display.set_mode((self.width, self.height))
         pygame.display.set_caption("Крестики-нолики")
-        
-        self.font = pygame.font.SysFont("Arial", 50, bold=True)
-        self.info_font = pygame.font.SysFont("Arial", 28, bold=True)
-
-    def draw(self, field, game_over, winner, current_player):
-        self.screen.fill((170, 110, 70))
-
-        for row in range(self.y_size):
-            for col in range(self.x_size):
-                x = self.margin + col * (self.cell_size + self.margin)
-                y = self.margin + row * (self.cell_size + self.margin)
-                rect = pygame.Rect(x, y, self.cell_size, self.cell_size)
-                
-                pygame.draw.rect(self.screen, (220, 160, 120), rect)
-                pygame.draw.rect(self.screen, (0, 0, 0), rect, 3)
-
-                symbol = field.grid[row][col].symbol
-                if symbol != " ":
-                    color = (255, 248, 220) if symbol == "X" else (100, 50, 40)
-                    text = self.font.render(symbol, True, color)
-                    text_rect = text.get_rect(center=rect.center)
-                    self.screen.blit(text, text_rect)
-    
-        panel_height = 40
-        panel_y = self.height - panel_height
-        pygame.draw.rect(self.screen, (250, 250, 250), (0, panel_y, self.width, panel_height))
-        
-        if game_over:
+
+        self.info_font = get_font("Arial", 28, bold=True)
+        self.overlay_font = get_font("Arial", 13) if self.overlay else None
+
+        self.view_rect = pygame.Rect(0, 0, self.width, self.height - self.panel_height)
+        self.panel_rect = pygame.Rect(0, self.height - self.panel_height, self.width, self.panel_height)
+        self.offset_x = 0
+        self.offset_y = 0
+        self.center_view()
+        self.dragging = False
+        self.glyphs = {}
+        self.background = None
+
+        # Что уже нарисовано на экране: по этим данным перерисовываем только изменившееся
+        self.field = None
+        self.drawn_version = None
+        self.status = None
+
+    @staticmethod
+    def _available_size():
+        info = pygame.display.Info()
+        if info.current_w > 0 and info.current_h > 0:
+            return int(info.current_w * 0.9), int(info.current_h * 0.85)
+        return 1280, 900
+
+    @property
+    def margin(self):
+        return max(1, self.cell_size // 10)
+
+    def board_size(self):
+        step = self.cell_size + self.margin
+        return self.x_size * step + self.margin, self.y_size * step + self.margin
+
+    def _fit_cell_size(self, width, height):
+        cell_size = self.base_cell_size
+        while cell_size > self.min_cell_size:
+            self.cell_size = cell_size
+            board_width, board_height = self.board_size()
+            if board_width <= width and board_height <= height:
+                break
+            cell_size -= 1
+        return cell_size
+
+    def center_view(self):
+        board_width, board_height = self.board_size()
+        self.offset_x = (board_width - self.view_rect.width) // 2
+        self.offset_y = (board_height - self.view_rect.height) // 2
+        self._clamp_offset()
+
+    def _clamp_offset(self):
+        board_width, board_height = self.board_size()
+        if board_width <= self.view_rect.width:
+            self.offset_x = (board_width - self.view_rect.width) // 2
+        else:
+            self.offset_x = max(0, min(self.offset_x, board_width - self.view_rect.width))
+        if board_height <= self.view_rect.height:
+            self.offset_y = (board_height - self.view_rect.height) // 2
+        else:
+            self.offset_y = max(0, min(self.offset_y, board_height - self.view_rect.height))
+
+    def zoom(self, factor, anchor=None):
+        # Масштаб вокруг точки anchor (по умолчанию — центр вида): точка под курсором остаётся на месте
+        if anchor is None:
+            anchor = self.view_rect.center
+        step = self.cell_size + self.margin
+        board_x = anchor[0] + self.offset_x
+        board_y = anchor[1] + self.offset_y
+
+        cell_size = int(round(self.cell_size * factor))
+        if cell_size == self.cell_size:
+            cell_size += 1 if factor > 1 else -1
+        self.cell_size = max(self.min_cell_size, min(self.max_cell_size, cell_size))
+
+        scale = (self.cell_size + self.margin) / step
+        self.offset_x = int(board_x * scale) - anchor[0]
+        self.offset_y = int(board_y * scale) - anchor[1]
+        self._clamp_offset()
+        self.invalidate()
+
+    def pan(self, dx, dy):
+        self.offset_x += dx
+        self.offset_y += dy
+        self._clamp_offset()
+        self.invalidate()
+
+    def fit(self):
+        self.cell_size = self._fit_cell_size(self.view_rect.width, self.view_rect.height)
+        self.center_view()
+        self.invalidate()
+
+    def handle_view_event(self, event):
+        # Колесо — масштаб, правая/средняя кнопка — перетаскивание, стрелки и +/-/0 — с клавиатуры.
+        # Возвращает True, если событие относилось к виду
+        if event.type == pygame.MOUSEWHEEL:
+            self.zoom(1.25 if event.y > 0 else 0.8, pygame.mouse.get_pos())
+            return True
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button in (4, 5):
+            return True
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button in (2, 3):
+            self.dragging = True
+            pygame.event.set_allowed(pygame.MOUSEMOTION)
+            return True
+        if event.type == pygame.MOUSEBUTTONUP and event.button in (2, 3):
+            self.dragging = False
+            pygame.event.set_blocked(pygame.MOUSEMOTION)
+            return True
+        if event.type == pygame.MOUSEMOTION:
+            if self.dragging:
+                self.pan(-event.rel[0], -event.rel[1])
+            return True
+        if event.type == pygame.KEYDOWN:
+            step = self.cell_size + self.margin
+            moves = {
+                pygame.K_LEFT: (-step, 0), pygame.K_RIGHT: (step, 0),
+                pygame.K_UP: (0, -step), pygame.K_DOWN: (0, step),
+            }
+            if event.key in moves:
+                self.pan(*moves[event.key])
+                return True
+            if event.key in (pygame.K_EQUALS, pygame.K_PLUS, pygame.K_KP_PLUS):
+                self.zoom(1.25)
+                return True
+            if event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                self.zoom(0.8)
+                return True
+            if event.key in (pygame.K_0, pygame.K_KP0):
+                self.fit()
+                return True
+        return False
+
+    def invalidate(self):
+        # Следующий draw перерисует всё окно (например, после того как окно было перекрыто)
+        self.field = None
+        self.background = None
+
+    def cell_rect(self, row, col):
+        step = self.cell_size + self.margin
+        x = self.margin + col * step - self.offset_x
+        y = self.margin + row * step - self.offset_y
+        return pygame.Rect(x, y, self.cell_size, self.cell_size)
+
+    def visible_cells(self):
+        # Отсечение: только строки и столбцы, попадающие в окно
+        step = self.cell_size + self.margin
+        first_col = max(0, (self.offset_x - self.margin) // step)
+        last_col = min(self.x_size - 1, (self.offset_x + self.view_rect.width) // step)
+        first_row = max(0, (self.offset_y - self.margin) // step)
+        last_row = min(self.y_size - 1, (self.offset_y + self.view_rect.height) // step)
+        return range(first_row, last_row + 1), range(first_col, last_col + 1)
+
+    def _build_background(self):
+        # Пустое поле в текущем виде рисуется один раз, дальше из него восстанавливаются клетки
+        background = pygame.Surface((self.width, self.height)).convert()
+        background.fill((170, 110, 70))
+        border = max(1, min(3, self.cell_size // 30))
+        rows, cols = self.visible_cells()
+        for row in rows:
+            for col in cols:
+                rect = self.cell_rect(row, col)
+                pygame.draw.rect(background, (220, 160, 120), rect)
+                pygame.draw.rect(background, (0, 0, 0), rect, border)
+        pygame.draw.rect(background, (250, 250, 250), self.panel_rect)
+        return background
+
+    def glyph(self, symbol):
+        font_size = max(6, self.cell_size // 2)
+        surface = self.glyphs.get((symbol, font_size))
+        if surface is None:
+            font = get_font("Arial", font_size, bold=True)
+            color = (255, 248, 220) if symbol == "X" else (100, 50, 40)
+            surface = self.glyphs[(symbol, font_size)] = font.render(symbol, True, color)
+        return surface
+
+    def _draw_cell(self, row, col, symbol):
+        rect = self.cell_rect(row, col)
+        if symbol != " ":
+            glyph = self.glyph(symbol)
+            self.screen.blit(glyph, glyph.get_rect(center=rect.center))
+        return rect
+
+    def draw(self, field, game_over, winner, current_player, message=None):
+        # Возвращает список изменившихся прямоугольников для pygame.display.update
+        dirty = []
+        if field is not self.field or field.version != self.drawn_version:
+            single_move = (
+                field is self.field and self.drawn_version is not None
+                and field.version == self.drawn_version + 1 and field.last_change
+            )
+            if single_move:
+                # Одно изменение с прошлой отрисовки — ход или его отмена: перерисовываем эту клетку
+                row, col = field.last_change
+                rect = self.cell_rect(row, col)
+                if rect.colliderect(self.view_rect):
+                    self.screen.set_clip(self.view_rect)
+                    self.screen.blit(self.background, rect, rect)
+                    self._draw_cell(row, col, field.grid[row][col].symbol)
+                    self.screen.set_clip(None)
+                    dirty.append(rect.clip(self.view_rect))
+            else:
+                if self.background is None:
+                    self.background = self._build_background()
+                self.screen.blit(self.background, (0, 0))
+                self.screen.set_clip(self.view_rect)
+                rows, cols = self.visible_cells()
+                grid = field.grid
+                for row in rows:
+                    grid_row = grid[row]
+                    for col in cols:
+                        symbol = grid_row[col].symbol
+                        if symbol != " ":
+                            self._draw_cell(row, col, symbol)
+                self.screen.set_clip(None)
+                self.status = None
+                dirty.append(self.screen.get_rect())
+            self.field = field
+            self.drawn_version = field.version
+
+        if message:
+            msg = message
+        elif game_over:
             if winner:
                 msg = f"Победил {winner}!"
             else:
@@ -48,15 +258,35 @@ class GameRenderer:
         else:
             msg = f"Ход: {current_player.name} ({current_player.symbol})"
 
-        info = self.info_font.render(msg, True, (0, 0, 0))
-        info_rect = info.get_rect(center=(self.width // 2, panel_y + panel_height // 2))
-        self.screen.blit(info, info_rect)
+        status = msg
+        if self.overlay and profiling.PROFILER is not None:
+            # Перцентили пересчитываются не чаще двух раз в секунду
+            now = time.monotonic()
+            if now - self.overlay_time > 0.5:
+                self.overlay_time = now
+                self.overlay_text = profiling.PROFILER.overlay()
+            status = (msg, self.overlay_text)
+
+        if status != self.status:
+            self.status = status
+            self.screen.blit(self.background, self.panel_rect, self.panel_rect)
+            info = self.info_font.render(msg, True, (0, 0, 0))
+            info_rect = info.get_rect(center=(self.panel_rect.centerx, self.panel_rect.top + 20))
+            self.screen.blit(info, info_rect)
+            if self.overlay and self.overlay_text:
+                line = self.overlay_font.render(self.overlay_text, True, (90, 90, 90))
+                self.screen.blit(line, line.get_rect(midbottom=(self.panel_rect.centerx, self.panel_rect.bottom - 2)))
+            dirty.append(self.panel_rect)
+
+        return dirty
 
     def get_grid_coordinates(self, mouse_pos):
+        # Экранные координаты -> клетка поля с учётом сдвига и масштаба
         x, y = mouse_pos
-        if y > self.height - 40:
+        if not self.view_rect.collidepoint(x, y):
             return None, None
 
-        col = (x - self.margin) // (self.cell_size + self.margin)
-        row = (y - self.margin) // (self.cell_size + self.margin)
-        return row, col
\ No newline at end of file
+        step = self.cell_size + self.margin
+        col = (x + self.offset_x - self.margin) // step
+        row = (y + self.offset_y - self.margin) // step
+        return row, col
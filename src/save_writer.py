@@ -0,0 +1,66 @@
+# save_writer.py
+# Запись сохранения в фоновом потоке: частые обновления склеиваются, файл заменяется атомарно
+import threading
+from .logic import write_config_atomic
+
+
+class SaveWriter:
+    def __init__(self, filename="game_state.json", delay=0.2):
+        self.filename = filename
+        self.delay = delay
+        self.pending = None
+        self.writing = False
+        self.closed = False
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self._run, name="save-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, config):
+        # Вызывается из игрового цикла: только запоминаем последний снимок, без дискового ввода-вывода
+        with self.condition:
+            self.pending = config
+            self.condition.notify_all()
+
+    def discard(self):
+        # Отменить ещё не записанное сохранение (например, перед удалением файла при перезапуске)
+        with self.condition:
+            self.pending = None
+            while self.writing:
+                self.condition.wait()
+
+    def flush(self):
+        with self.condition:
+            while self.pending is not None or self.writing:
+                self.condition.notify_all()
+                self.condition.wait()
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.thread.join()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while self.pending is None and not self.closed:
+                    self.condition.wait()
+                if self.pending is None and self.closed:
+                    return
+                # Ждём ещё немного: следующие ходы за это время заменят снимок, запись будет одна
+                if not self.closed:
+                    self.condition.wait(self.delay)
+                config = self.pending
+                self.pending = None
+                self.writing = config is not None
+
+            if config is not None:
+                self._write(config)
+
+            with self.condition:
+                self.writing = False
+                self.condition.notify_all()
+
+    def _write(self, config):
+        # Отдельный метод, чтобы замеры (src/profiling.py) видели дисковую запись сохранения
+        return write_config_atomic(config, self.filename)
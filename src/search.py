@@ -0,0 +1,315 @@
+# search.py
+import random
+import time
+from .logic import build_line_masks, build_cell_lines
+from .symmetry import symmetry_permutations, inverse_permutation, canonical_form, PositionCache
+
+WIN_SCORE = 1000000
+EXACT, LOWER, UPPER = 0, 1, 2
+# Часы и отмена проверяются раз в POLL_NODES узлов: на 15x15 узел стоит до миллисекунды,
+# и при редкой проверке ход заметно выходит за лимит времени
+POLL_NODES = 64
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class TranspositionTable:
+    # Ограниченная по размеру таблица: при переполнении вытесняется самая старая запись
+    def __init__(self, max_entries=200000):
+        self.max_entries = max_entries
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def put(self, key, depth, score, flag, move):
+        entries = self.entries
+        if key not in entries and len(entries) >= self.max_entries:
+            del entries[next(iter(entries))]
+            self.evictions += 1
+        entries[key] = (depth, score, flag, move)
+
+    def clear(self):
+        self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class NegamaxSearch:
+    # Negamax с альфа-бета отсечением на битовых масках.
+    # Камни хранятся по "цветам": цвет 0 ходит, когда камней поровну, поэтому таблица
+    # не зависит от символов игроков и переиспользуется между ходами и партиями.
+    # Ключ таблицы — минимальный из Zobrist-хэшей всех симметричных копий позиции
+    def __init__(self, y_size, x_size, win_length=None, max_entries=200000, seed=0, cache_size=50000):
+        self.y_size = y_size
+        self.x_size = x_size
+        self.win_length = win_length
+        self.total_cells = y_size * x_size
+        self.lines = build_line_masks(y_size, x_size, win_length)
+        self.cell_lines = build_cell_lines(y_size, x_size, self.lines)
+        self.table = TranspositionTable(max_entries)
+
+        rng = random.Random(seed)
+        self.zobrist = [[rng.getrandbits(64) for _ in range(self.total_cells)] for _ in range(2)]
+
+        self.perms = symmetry_permutations(y_size, x_size)
+        self.inverses = [inverse_permutation(perm) for perm in self.perms]
+        # sym_keys[color][i] — вклад камня в клетке i в хэш каждой из симметричных копий
+        self.sym_keys = [
+            [tuple(self.zobrist[color][perm[i]] for perm in self.perms) for i in range(self.total_cells)]
+            for color in (0, 1)
+        ]
+        self.solved = PositionCache(cache_size)
+
+        # Статический порядок ходов: сначала клетки с большим числом линий, затем ближе к центру
+        cy, cx = (y_size - 1) / 2, (x_size - 1) / 2
+        self.order = sorted(
+            range(self.total_cells),
+            key=lambda i: (-len(self.cell_lines[i]), abs(i // x_size - cy) + abs(i % x_size - cx))
+        )
+        longest = max((mask.bit_count() for mask in self.lines), default=0)
+        self.weights = [0] + [4 ** count for count in range(longest)]
+        # Оценки от mate_bound и выше — только выигрыши; эвристика на больших полях ограничивается ниже,
+        # иначе сумма весов по линиям попадает в эту полосу и позиция считается решённой
+        self.mate_bound = WIN_SCORE - self.total_cells
+        self.eval_limit = self.mate_bound - 1
+
+        self.nodes = 0
+        self.deadline = None
+        self.max_nodes = None
+        self.cancel = None
+
+    def hash_position(self, boards):
+        keys = [0] * len(self.perms)
+        for color in (0, 1):
+            board = boards[color]
+            while board:
+                low = board & -board
+                deltas = self.sym_keys[color][low.bit_length() - 1]
+                keys = [key ^ delta for key, delta in zip(keys, deltas)]
+                board ^= low
+        return tuple(keys)
+
+    def stats(self):
+        cache = self.solved.stats()
+        return {
+            'table_hits': self.table.hits,
+            'table_misses': self.table.misses,
+            'table_size': len(self.table),
+            'table_evictions': self.table.evictions,
+            'cache_hits': cache['hits'],
+            'cache_misses': cache['misses'],
+            'cache_size': cache['size'],
+        }
+
+    def is_win(self, board, index):
+        for mask in self.cell_lines[index]:
+            if board & mask == mask:
+                return True
+        return False
+
+    def evaluate(self, me, opp):
+        score = 0
+        weights = self.weights
+        for mask in self.lines:
+            mine = me & mask
+            theirs = opp & mask
+            if not theirs:
+                score += weights[mine.bit_count()]
+            elif not mine:
+                score -= weights[theirs.bit_count()]
+        return max(-self.eval_limit, min(self.eval_limit, score))
+
+    def score_to_table(self, score, ply):
+        # Выигрыш в таблице хранится как расстояние от этой позиции, а не от корня текущего поиска:
+        # запись переживает ход и партию, и к ней можно прийти на другой глубине
+        if score >= self.mate_bound:
+            return score + ply
+        if score <= -self.mate_bound:
+            return score - ply
+        return score
+
+    def score_from_table(self, score, ply):
+        if score >= self.mate_bound:
+            return score - ply
+        if score <= -self.mate_bound:
+            return score + ply
+        return score
+
+    def best_move(self, me, opp, time_limit=0.4, cancel=None, max_nodes=None):
+        # Итеративное углубление: возвращаем лучший ход последней завершённой глубины.
+        # cancel — threading.Event, по которому расчёт прерывается досрочно.
+        # max_nodes — бюджет в узлах вместо часов (time_limit=None): ход не зависит от скорости машины
+        occupied = me | opp
+        free = [i for i in self.order if not occupied >> i & 1]
+        if not free:
+            return None
+        if len(free) == 1:
+            return free[0]
+
+        cells = tuple(1 if me >> i & 1 else 2 if opp >> i & 1 else 0 for i in range(self.total_cells))
+        form, sym = canonical_form(cells, self.perms)
+        cached = self.solved.get(form)
+        if cached is not None:
+            return self.inverses[sym][cached]
+
+        color = 0 if me.bit_count() == opp.bit_count() else 1
+        boards = [0, 0]
+        boards[color] = me
+        boards[1 - color] = opp
+        keys = self.hash_position(boards)
+
+        self.nodes = 0
+        self.deadline = time.perf_counter() + time_limit if time_limit is not None else None
+        self.max_nodes = max_nodes
+        self.cancel = cancel
+        best = free[0]
+        solved = False
+        for depth in range(1, len(free) + 1):
+            try:
+                score, move = self._root(me, opp, color, keys, depth)
+            except SearchTimeout:
+                break
+            if move is not None:
+                best = move
+            if abs(score) >= self.mate_bound or depth == len(free):
+                solved = True
+                break
+
+        if solved:
+            self.solved.put(form, self.perms[sym][best])
+        return best
+
+    def _root(self, me, opp, color, keys, depth):
+        return self._negamax(me, opp, color, keys, depth, -WIN_SCORE - 1, WIN_SCORE + 1, 0)
+
+    def _negamax(self, me, opp, color, keys, depth, alpha, beta, ply):
+        self.nodes += 1
+        if self.nodes % POLL_NODES == 0:
+            if self.max_nodes is not None and self.nodes >= self.max_nodes:
+                raise SearchTimeout()
+            if self.deadline is not None and time.perf_counter() > self.deadline:
+                raise SearchTimeout()
+            if self.cancel is not None and self.cancel.is_set():
+                raise SearchTimeout()
+
+        occupied = me | opp
+        moves = [i for i in self.order if not occupied >> i & 1]
+        if not moves:
+            return 0, None
+
+        for index in moves:
+            if self.is_win(me | 1 << index, index):
+                return WIN_SCORE - ply, index
+
+        threats = [index for index in moves if self.is_win(opp | 1 << index, index)]
+        if threats:
+            moves = threats[:1]
+
+        if depth == 0:
+            return self.evaluate(me, opp), None
+
+        alpha_orig = alpha
+        key = min(keys)
+        sym = keys.index(key)
+        entry = self.table.get(key)
+        tt_move = None
+        if entry is not None:
+            e_depth, e_score, e_flag, tt_move = entry
+            e_score = self.score_from_table(e_score, ply)
+            tt_move = self.inverses[sym][tt_move]
+            if e_depth >= depth:
+                if e_flag == EXACT:
+                    return e_score, tt_move
+                if e_flag == LOWER:
+                    alpha = max(alpha, e_score)
+                elif e_flag == UPPER:
+                    beta = min(beta, e_score)
+                if alpha >= beta:
+                    return e_score, tt_move
+            if tt_move in moves and moves[0] != tt_move:
+                moves.remove(tt_move)
+                moves.insert(0, tt_move)
+
+        sym_keys = self.sym_keys[color]
+        best_score = -WIN_SCORE - 1
+        best_move = moves[0]
+        for index in moves:
+            child_keys = tuple(k ^ delta for k, delta in zip(keys, sym_keys[index]))
+            score, _ = self._negamax(
+                opp, me | 1 << index, 1 - color, child_keys,
+                depth - 1, -beta, -alpha, ply + 1
+            )
+            score = -score
+            if score > best_score:
+                best_score = score
+                best_move = index
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                break
+
+        if best_score <= alpha_orig:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.table.put(key, depth, self.score_to_table(best_score, ply), flag, self.perms[sym][best_move])
+        return best_score, best_move
+
+
+_ENGINES = {}
+
+
+def get_engine(y_size, x_size, win_length=None):
+    # Один движок (и одна таблица транспозиций) на размер поля и правило победы
+    key = (y_size, x_size, win_length)
+    engine = _ENGINES.get(key)
+    if engine is None:
+        engine = _ENGINES[key] = NegamaxSearch(y_size, x_size, win_length)
+    return engine
+
+
+def reset_engines():
+    # Забыть все движки вместе с таблицами транспозиций и кэшем решённых позиций.
+    # Турнир и датасет вызывают это перед каждой партией: иначе ход зависит от того,
+    # какие партии этот процесс уже сыграл, и результат — от числа процессов
+    _ENGINES.clear()
+
+
+def merge_stats(totals, stats):
+    for key, value in stats.items():
+        totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+def engine_stats():
+    # Счётчики всех живых движков вместе — до reset_engines(), который их забывает
+    totals = {}
+    for engine in _ENGINES.values():
+        merge_stats(totals, engine.stats())
+    return totals
+
+
+def format_stats(stats):
+    # Строка для вывода simulate и tournament; None, если перебор ни разу не запускался
+    lookups = stats.get('table_hits', 0) + stats.get('table_misses', 0)
+    solved = stats.get('cache_hits', 0) + stats.get('cache_misses', 0)
+    if not lookups and not solved:
+        return None
+    return (f"Таблица транспозиций: попаданий {stats['table_hits']} из {lookups} "
+            f"({100 * stats['table_hits'] / max(lookups, 1):.1f}%), вытеснено {stats['table_evictions']}; "
+            f"кэш решённых позиций: попаданий {stats['cache_hits']} из {solved} "
+            f"({100 * stats['cache_hits'] / max(solved, 1):.1f}%)")
@@ -0,0 +1,375 @@
+# server.py
+# Сервер партий на asyncio: один цикл событий, по лёгкому Field на сессию, без потоков на игру.
+#
+# Протокол — JSON-объекты, по одному в строке (UTF-8).
+# Клиент -> сервер:
+#   {"cmd": "join", "name": "...", "session": id или null, "y_size": 3, "x_size": 3, "win_length": null}
+#     (в уже идущую сессию можно вернуться по её номеру, указав "token" своего места;
+#      на ещё не занятое место сессии по номеру садятся без токена, "symbol" выбирает место)
+#   {"cmd": "move", "position": 1..x_size*y_size}
+# Сервер -> клиент:
+#   {"event": "joined", "session": id, "symbol": "X"|"O", "token": "...", "y_size", "x_size", "win_length",
+#    "moves": [[позиция, символ], ...]}
+#   {"event": "start", "players": [{"name", "symbol"}, ...], "current": "X"}
+#   {"event": "move", "position", "symbol", "current", "winner": символ или null, "draw": bool}
+#   {"event": "left", "name"} — соперник отключился, сессия ждёт его возвращения
+#   {"event": "error", "message"}
+# Размер поля — целые 1..max_size (больше — урезается до max_size), win_length — null или 1..большая сторона.
+import argparse
+import asyncio
+import json
+import random
+import secrets
+import time
+from .sessions import SYMBOLS, SessionStore
+
+MAX_SIZE = 100
+
+
+class ProtocolError(Exception):
+    # Некорректный запрос клиента: уходит ему сообщением {"event": "error"}, соединение остаётся
+    pass
+
+
+def _int_param(message, name, default):
+    value = message.get(name, default)
+    # bool — тоже int, но размером поля быть не может
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise ProtocolError(f"{name} должен быть целым числом")
+    return value
+
+
+async def send(writer, message):
+    writer.write(json.dumps(message, ensure_ascii=False).encode('utf-8') + b"\n")
+    await writer.drain()
+
+
+class GameServer:
+    def __init__(self, store=None, evict_every=30.0, max_size=MAX_SIZE):
+        # Состояние партий — в SessionStore, здесь только подключения игроков
+        self.store = store or SessionStore()
+        self.evict_every = evict_every
+        self.max_size = max_size
+        self.seats = {}         # id сессии -> [writer или None, writer или None]
+        self.waiting = {}       # настройки поля -> id сессии, ждущей второго игрока
+        self.server = None
+
+    async def start(self, host="127.0.0.1", port=8765):
+        self.server = await asyncio.start_server(self.handle_client, host, port, limit=4096, backlog=4096)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        async with self.server:
+            evictor = asyncio.create_task(self._evict_loop())
+            try:
+                await self.server.serve_forever()
+            finally:
+                evictor.cancel()
+
+    async def _evict_loop(self):
+        # Простаивающие партии уходят на диск и поднимаются обратно при следующем обращении
+        while True:
+            await asyncio.sleep(self.evict_every)
+            self.store.evict_idle()
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+
+    def _join(self, message):
+        # Возвращает (запись сессии, индекс места) или (None, None)
+        session_id = message.get("session")
+        token = message.get("token")
+        if session_id is not None:
+            if not isinstance(session_id, int) or isinstance(session_id, bool):
+                raise ProtocolError("session должен быть номером сессии")
+            record = self.store.get(session_id)
+            if record is None or record.finished:
+                return None, None
+            if token is not None:
+                # Возвращение на своё место: номера сессий идут подряд, поэтому место отдаётся только по токену.
+                # Если старое соединение ещё не закрылось, место переходит к новому
+                if token not in record.tokens:
+                    raise ProtocolError("Неверный токен сессии")
+                return record, record.tokens.index(token)
+        else:
+            y_size, x_size = (_int_param(message, name, 3) for name in ("y_size", "x_size"))
+            if y_size < 1 or x_size < 1:
+                raise ProtocolError("Размер поля должен быть не меньше 1x1")
+            y_size = min(y_size, self.max_size)
+            x_size = min(x_size, self.max_size)
+            win_length = message.get("win_length")
+            if win_length is not None:
+                win_length = _int_param(message, "win_length", None)
+                if not 1 <= win_length <= max(y_size, x_size):
+                    raise ProtocolError("win_length должен быть от 1 до длины большей стороны поля")
+            key = (y_size, x_size, win_length)
+            record = None
+            if key in self.waiting:
+                record = self.store.get(self.waiting[key])
+            if record is None:
+                record = self.store.create(y_size, x_size, win_length)
+                self.waiting[key] = record.id
+
+        # Без токена садимся только на место, которое ещё никто не занимал
+        free = [index for index in (0, 1) if record.tokens[index] is None]
+        symbol = message.get("symbol")
+        if symbol in SYMBOLS and SYMBOLS.index(symbol) in free:
+            index = SYMBOLS.index(symbol)
+        elif free:
+            index = free[0]
+        else:
+            return None, None
+        if index == 1 or record.names[1] is not None:
+            if self.waiting.get(record.settings) == record.id:
+                del self.waiting[record.settings]
+        return record, index
+
+    async def _broadcast(self, session_id, message):
+        # Каждому игроку отдельно: сбой отправки сопернику не должен отключать того, кто ходил.
+        # Упавшее соединение освобождает своё место, его обработчик закроется на следующем чтении
+        seats = self.seats.get(session_id)
+        if seats is None:
+            return
+        for index, player_writer in enumerate(seats):
+            if player_writer is None:
+                continue
+            try:
+                await send(player_writer, message)
+            except ConnectionError:
+                if seats[index] is player_writer:
+                    seats[index] = None
+                player_writer.close()
+
+    def _board(self, record):
+        # Уже сделанные ходы для игрока, который вернулся в партию
+        if not record.moves:
+            return []
+        field = self.store.field(record)
+        return [[index + 1, field.symbol_at(index)]
+                for index in range(record.x_size * record.y_size) if field.symbol_at(index) != " "]
+
+    async def handle_client(self, reader, writer):
+        # Храним только номер сессии: запись могла уйти на диск и вернуться новым объектом
+        session_id = None
+        index = None
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Строка длиннее лимита потока: asyncio её уже отбросил, соединение живо
+                    await send(writer, {"event": "error", "message": "Слишком длинное сообщение"})
+                    continue
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    await send(writer, {"event": "error", "message": "Некорректный JSON"})
+                    continue
+
+                # Ошибка в одном сообщении — ответ с ошибкой, а не разрыв соединения
+                try:
+                    if not isinstance(message, dict):
+                        raise ProtocolError("Сообщение должно быть JSON-объектом")
+                    cmd = message.get("cmd")
+                    if cmd == "join" and session_id is None:
+                        joined = await self._handle_join(writer, message)
+                        if joined is not None:
+                            session_id, index = joined
+                    elif cmd == "move" and session_id is not None:
+                        await self._move(session_id, index, writer, message)
+                    else:
+                        raise ProtocolError("Неизвестная команда")
+                except ProtocolError as e:
+                    await send(writer, {"event": "error", "message": str(e)})
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except Exception as e:
+                    print(f"Ошибка обработки сообщения {line[:200]!r}: {e!r}")
+                    await send(writer, {"event": "error", "message": "Внутренняя ошибка сервера"})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            if session_id is not None:
+                await self._leave(session_id, index, writer)
+            writer.close()
+
+    async def _handle_join(self, writer, message):
+        # Возвращает (id сессии, индекс места) или None, если сесть некуда
+        record, index = self._join(message)
+        if record is None:
+            await send(writer, {"event": "error", "message": "Сессия не найдена или уже заполнена"})
+            return None
+        seats = self.seats.setdefault(record.id, [None, None])
+        if seats[index] is not None:
+            # Игрок вернулся по токену, а старое соединение ещё висит — закрываем его
+            seats[index].close()
+        seats[index] = writer
+        names = list(record.names)
+        names[index] = str(message.get("name") or names[index] or f"Игрок {index + 1}")
+        record.names = tuple(names)
+        if record.tokens[index] is None:
+            tokens = list(record.tokens)
+            tokens[index] = secrets.token_hex(16)
+            record.tokens = tuple(tokens)
+        await send(writer, {
+            "event": "joined", "session": record.id, "symbol": SYMBOLS[index], "token": record.tokens[index],
+            "y_size": record.y_size, "x_size": record.x_size, "win_length": record.win_length,
+            "moves": self._board(record),
+        })
+        if seats[0] is not None and seats[1] is not None:
+            start = {
+                "event": "start",
+                "players": [{"name": name, "symbol": SYMBOLS[i]} for i, name in enumerate(record.names)],
+                "current": SYMBOLS[record.current],
+            }
+            await self._broadcast(record.id, start)
+        return record.id, index
+
+    async def _move(self, session_id, index, writer, message):
+        # Запись могла уйти на диск, пока игроки думали, — store.get поднимет её обратно
+        record = self.store.get(session_id)
+        seats = self.seats.get(session_id)
+        if record is None or record.finished or seats is None or None in seats:
+            await send(writer, {"event": "error", "message": "Партия не идёт"})
+            return
+        if index != record.current:
+            await send(writer, {"event": "error", "message": "Сейчас ход соперника"})
+            return
+
+        field = self.store.field(record)
+        position = message.get("position")
+        symbol = SYMBOLS[index]
+        if not isinstance(position, int) or isinstance(position, bool) or not field.make_move(position, symbol):
+            await send(writer, {"event": "error", "message": "Недопустимый ход"})
+            return
+
+        winner = symbol if field.last_move_wins(symbol) else None
+        draw = winner is None and field.is_draw()
+        record.moves += 1
+        record.finished = winner is not None or draw
+        record.current = 1 - index
+        update = {
+            "event": "move", "position": position, "symbol": symbol,
+            "current": SYMBOLS[record.current], "winner": winner, "draw": draw,
+        }
+        await self._broadcast(session_id, update)
+        if record.finished:
+            self.store.remove(record.id)
+
+    async def _leave(self, session_id, index, writer):
+        seats = self.seats.get(session_id)
+        if seats is None:
+            return
+        if seats[index] is writer:
+            seats[index] = None
+        elif seats[index] is not None:
+            # Место уже освобождено рассылкой и занято вернувшимся игроком
+            return
+        record = self.store.get(session_id)
+        if record is None:
+            # Партия уже доиграна и удалена из хранилища
+            if seats[1 - index] is None:
+                del self.seats[session_id]
+            return
+        if record.names[1] is None:
+            # Соперник так и не пришёл — сессия больше не нужна
+            if self.waiting.get(record.settings) == record.id:
+                del self.waiting[record.settings]
+            del self.seats[record.id]
+            self.store.remove(record.id)
+            return
+        # Сессия остаётся: отключившийся игрок может вернуться по номеру сессии и своему токену
+        if seats[1 - index] is None:
+            del self.seats[record.id]
+        else:
+            try:
+                await send(seats[1 - index], {"event": "left", "name": record.names[index]})
+            except ConnectionError:
+                pass
+
+
+async def _random_player(host, port, name, settings, rng):
+    # Клиент для проверки на localhost: ходит случайно, пока партия не кончится
+    reader, writer = await asyncio.open_connection(host, port)
+    y_size, x_size, win_length = settings
+    await send(writer, {"cmd": "join", "name": name, "session": None,
+                        "y_size": y_size, "x_size": x_size, "win_length": win_length})
+    free = list(range(1, y_size * x_size + 1))
+    symbol = None
+    result = None
+    while result is None:
+        line = await reader.readline()
+        if not line:
+            break
+        message = json.loads(line)
+        event = message["event"]
+        if event == "joined":
+            symbol = message["symbol"]
+            continue
+        if event == "move":
+            free.remove(message["position"])
+            if message["winner"] or message["draw"]:
+                result = message["winner"] or "draw"
+                break
+        if event in ("left", "error"):
+            result = event
+            break
+        if event in ("start", "move") and message["current"] == symbol:
+            await send(writer, {"cmd": "move", "position": rng.choice(free)})
+    writer.close()
+    return result
+
+
+async def run_load_test(sessions=1000, settings=(3, 3, None), seed=0):
+    server = GameServer()
+    port = await server.start("127.0.0.1", 0)
+    rng = random.Random(seed)
+
+    # Все клиенты подключаются одновременно, сервер сам разбивает их на пары
+    started = time.perf_counter()
+    results = await asyncio.gather(*(
+        _random_player("127.0.0.1", port, f"Игрок {number}", settings, rng)
+        for number in range(sessions * 2)
+    ))
+    elapsed = time.perf_counter() - started
+    server.close()
+    return results, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Сервер сетевых партий крестиков-ноликов")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--store", default=None, metavar="PATH",
+                        help="файл sqlite для простаивающих партий (по умолчанию они остаются в памяти)")
+    parser.add_argument("--idle-timeout", type=float, default=300.0,
+                        help="через сколько секунд без ходов партия уходит на диск")
+    parser.add_argument("--max-size", type=int, default=MAX_SIZE,
+                        help="наибольшая сторона поля; запросы больше урезаются до неё")
+    parser.add_argument("--load-test", type=int, default=0, metavar="N",
+                        help="сыграть N параллельных партий случайных клиентов через localhost и выйти")
+    args = parser.parse_args(argv)
+
+    if args.load_test:
+        results, elapsed = asyncio.run(run_load_test(args.load_test))
+        finished = sum(1 for result in results if result in ("X", "O", "draw")) // 2
+        print(f"{args.load_test} сессий за {elapsed:.2f} с, доиграно корректно: {finished}")
+        return
+
+    async def serve():
+        server = GameServer(SessionStore(args.store, idle_timeout=args.idle_timeout), max_size=args.max_size)
+        port = await server.start(args.host, args.port)
+        print(f"Сервер запущен на {args.host}:{port}")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
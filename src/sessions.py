@@ -0,0 +1,232 @@
+# sessions.py
+# Хранилище сессий сервера. Три уровня:
+#   - горячие: живой BitField для недавно сыгранных партий (ограниченный LRU),
+#   - тёплые: компактная запись SessionRecord с упакованным полем (две битовые маски в bytes),
+#   - холодные: записи простаивающих партий на диске (sqlite3), поднимаются обратно при обращении.
+import sqlite3
+import struct
+import sys
+import time
+from collections import OrderedDict
+from .logic import BitField, create_field
+
+SYMBOLS = ("X", "O")
+# Число ходов — I: на больших полях клеток может быть больше 65535.
+# last_active — время по часам (time.time()), а не monotonic: запись переживает перезапуск сервера
+RECORD_HEAD = struct.Struct("<HHHBBId")
+
+
+class SessionRecord:
+    __slots__ = ('id', 'y_size', 'x_size', 'win_length', 'board', 'current', 'moves',
+                 'names', 'tokens', 'finished', 'last_active')
+
+    def __init__(self, session_id, y_size, x_size, win_length, board=None, current=0, moves=0,
+                 names=(None, None), finished=False, last_active=0.0, tokens=(None, None)):
+        self.id = session_id
+        self.y_size = y_size
+        self.x_size = x_size
+        self.win_length = win_length
+        self.board = board          # None — поле сейчас в горячем кэше
+        self.current = current
+        self.moves = moves
+        self.names = names
+        self.tokens = tokens        # секрет места: только с ним можно вернуться в начатую партию
+        self.finished = finished
+        self.last_active = last_active
+
+    @property
+    def settings(self):
+        return self.y_size, self.x_size, self.win_length
+
+
+def pack_field(field):
+    # Поле -> маска X + маска O, каждая по ceil(клеток / 8) байт
+    size = (field.x_size * field.y_size + 7) // 8
+    if isinstance(field, BitField):
+        masks = [field.boards.get(symbol, 0) for symbol in SYMBOLS]
+    else:
+        masks = [0, 0]
+        index = 0
+        for row in field.grid:
+            for cell in row:
+                if cell.symbol in SYMBOLS:
+                    masks[SYMBOLS.index(cell.symbol)] |= 1 << index
+                index += 1
+    return b"".join(mask.to_bytes(size, 'little') for mask in masks)
+
+
+def unpack_field(record):
+    field = create_field(record.y_size, record.x_size, "bitboard", record.win_length)
+    size = (record.x_size * record.y_size + 7) // 8
+    if record.board:
+        for number, symbol in enumerate(SYMBOLS):
+            mask = int.from_bytes(record.board[number * size:(number + 1) * size], 'little')
+            while mask:
+                low = mask & -mask
+                field.make_move(low.bit_length(), symbol)
+                mask ^= low
+    return field
+
+
+def _pack_name(name):
+    data = (name or "").encode('utf-8')
+    return struct.pack("<H", len(data)) + data
+
+
+def dump_record(record):
+    head = RECORD_HEAD.pack(record.y_size, record.x_size, record.win_length or 0, record.current,
+                            record.finished, record.moves, record.last_active)
+    strings = record.names + record.tokens
+    return head + b"".join(_pack_name(string) for string in strings) + record.board
+
+
+def load_record(session_id, data):
+    y_size, x_size, win_length, current, finished, moves, last_active = RECORD_HEAD.unpack_from(data)
+    offset = RECORD_HEAD.size
+    strings = []
+    for _ in range(4):
+        (length,) = struct.unpack_from("<H", data, offset)
+        offset += 2
+        strings.append(data[offset:offset + length].decode('utf-8') or None)
+        offset += length
+    return SessionRecord(session_id, y_size, x_size, win_length or None, data[offset:], current, moves,
+                         tuple(strings[:2]), bool(finished), last_active, tuple(strings[2:]))
+
+
+def record_size(record):
+    # Сколько байт занимает тёплая запись вместе с полем, именами и токенами
+    size = sys.getsizeof(record) + sys.getsizeof(record.names) + sys.getsizeof(record.tokens)
+    if record.board is not None:
+        size += sys.getsizeof(record.board)
+    for string in record.names + record.tokens:
+        if string is not None:
+            size += sys.getsizeof(string)
+    return size
+
+
+class SessionStore:
+    def __init__(self, path=None, max_hot=1024, max_records=100000, idle_timeout=300.0):
+        # path=None — без диска: простаивающие партии остаются в памяти в упакованном виде
+        self.path = path
+        self.db = None
+        if path:
+            self.db = sqlite3.connect(path)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("CREATE TABLE IF NOT EXISTS sessions (id INTEGER PRIMARY KEY, data BLOB NOT NULL)")
+        self.max_hot = max_hot
+        self.max_records = max_records
+        self.idle_timeout = idle_timeout
+        self.records = OrderedDict()    # от давно не трогавшихся к недавним
+        self.hot = OrderedDict()        # id -> BitField
+        # Номера продолжаются после партий, оставшихся на диске с прошлого запуска
+        self.next_id = 1
+        if self.db is not None:
+            self.next_id = self.db.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM sessions").fetchone()[0]
+        self.evictions = 0
+        self.rehydrations = 0
+
+    def create(self, y_size, x_size, win_length=None):
+        session_id = self.next_id
+        self.next_id += 1
+        record = SessionRecord(session_id, y_size, x_size, win_length, b"", last_active=time.time())
+        self.records[session_id] = record
+        self._trim()
+        return record
+
+    def get(self, session_id):
+        record = self.records.get(session_id)
+        if record is not None:
+            self.touch(record)
+            return record
+        if self.db is None:
+            return None
+        row = self.db.execute("SELECT data FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        if row is None:
+            return None
+        record = load_record(session_id, row[0])
+        self.db.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+        self.db.commit()
+        self.records[session_id] = record
+        self.touch(record)
+        self.rehydrations += 1
+        self._trim()
+        return record
+
+    def field(self, record):
+        # Живое поле для хода: из горячего кэша или распакованное из записи
+        field = self.hot.get(record.id)
+        if field is not None:
+            self.hot.move_to_end(record.id)
+            return field
+        field = unpack_field(record)
+        record.board = None
+        self.hot[record.id] = field
+        while len(self.hot) > self.max_hot:
+            self._cool(next(iter(self.hot)))
+        return field
+
+    def touch(self, record):
+        record.last_active = time.time()
+        self.records.move_to_end(record.id)
+
+    def _cool(self, session_id):
+        field = self.hot.pop(session_id)
+        record = self.records.get(session_id)
+        if record is not None:
+            record.board = pack_field(field)
+
+    def _evict(self, session_ids):
+        rows = []
+        for session_id in session_ids:
+            if session_id in self.hot:
+                self._cool(session_id)
+            rows.append((session_id, dump_record(self.records.pop(session_id))))
+        self.db.executemany("INSERT OR REPLACE INTO sessions (id, data) VALUES (?, ?)", rows)
+        self.db.commit()
+        self.evictions += len(rows)
+
+    def _trim(self):
+        if self.db is None or len(self.records) <= self.max_records:
+            return
+        excess = len(self.records) - self.max_records
+        self._evict([session_id for session_id, _ in zip(self.records, range(excess))])
+
+    def evict_idle(self, now=None):
+        # Записи упорядочены по последнему обращению, поэтому проверяем только начало очереди
+        if self.db is None:
+            return 0
+        deadline = (time.time() if now is None else now) - self.idle_timeout
+        idle = []
+        for session_id, record in self.records.items():
+            if record.last_active > deadline:
+                break
+            idle.append(session_id)
+        if idle:
+            self._evict(idle)
+        return len(idle)
+
+    def remove(self, session_id):
+        self.hot.pop(session_id, None)
+        # Запись лежит либо в памяти, либо на диске — в базу идём, только если в памяти её нет
+        if self.records.pop(session_id, None) is None and self.db is not None:
+            self.db.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+            self.db.commit()
+
+    def stats(self):
+        in_memory = sum(record_size(record) for record in self.records.values())
+        return {
+            'records': len(self.records),
+            'on_disk': self.db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0] if self.db is not None else 0,
+            'hot': len(self.hot),
+            'record_bytes': in_memory,
+            'bytes_per_record': in_memory / len(self.records) if self.records else 0.0,
+            'evictions': self.evictions,
+            'rehydrations': self.rehydrations,
+        }
+
+    def close(self):
+        if self.db is not None:
+            if self.records:
+                self._evict(list(self.records))
+            self.db.close()
+            self.db = None
@@ -0,0 +1,125 @@
+# simulate.py
+# Партии бот-против-бота без окна, таймеров и файлов сохранения
+import argparse
+import random
+import time
+from .logic import create_field
+from .players import create_player
+from .search import engine_stats, format_stats
+from . import profiling
+
+
+def play_game(field, player1, player2, on_move=None):
+    # Возвращает (символ победителя или None при ничьей, число ходов).
+    # on_move(symbol, position) вызывается после каждого принятого хода — так пишется запись партии
+    current, other = player1, player2
+    moves = 0
+    while True:
+        move = current.get_move(field)
+        if not field.make_move(move, current.symbol):
+            raise ValueError(f"{current.name} сделал недопустимый ход {move}")
+        if on_move is not None:
+            on_move(current.symbol, move)
+        moves += 1
+        if field.last_move_wins(current.symbol):
+            return current.symbol, moves
+        if field.is_draw():
+            return None, moves
+        current, other = other, current
+
+
+class SimulationStats:
+    def __init__(self):
+        self.games = 0
+        self.wins = {}
+        self.draws = 0
+        self.total_moves = 0
+        self.elapsed = 0.0
+
+    def add(self, winner, moves):
+        self.games += 1
+        self.total_moves += moves
+        if winner is None:
+            self.draws += 1
+        else:
+            self.wins[winner] = self.wins.get(winner, 0) + 1
+
+    def merge(self, other):
+        self.games += other.games
+        self.draws += other.draws
+        self.total_moves += other.total_moves
+        for symbol, count in other.wins.items():
+            self.wins[symbol] = self.wins.get(symbol, 0) + count
+
+    def games_per_second(self):
+        return self.games / self.elapsed if self.elapsed else 0.0
+
+    def average_length(self):
+        return self.total_moves / self.games if self.games else 0.0
+
+    def report(self):
+        lines = [
+            f"Партий: {self.games} за {self.elapsed:.2f} с ({self.games_per_second():.0f} партий/с)",
+            f"Средняя длина партии: {self.average_length():.2f} хода",
+        ]
+        for symbol, count in sorted(self.wins.items()):
+            lines.append(f"Победы {symbol}: {count} ({100 * count / max(self.games, 1):.1f}%)")
+        lines.append(f"Ничьи: {self.draws} ({100 * self.draws / max(self.games, 1):.1f}%)")
+        return "\n".join(lines)
+
+
+def simulate(games, y_size=3, x_size=3, win_length=None, backend="cells",
+             player1_type="bot", player2_type="bot", player1_settings=None, player2_settings=None,
+             seed=None, alternate=True):
+    # alternate — первый ход по очереди у каждого игрока, как при перезапусках в обычной игре
+    rng = random.Random(seed)
+    player1 = create_player(player1_type, "Игрок 1", "X", player1_settings, rng)
+    player2 = create_player(player2_type, "Игрок 2", "O", player2_settings, rng)
+
+    stats = SimulationStats()
+    start = time.perf_counter()
+    for game_index in range(games):
+        field = create_field(y_size, x_size, backend, win_length)
+        if alternate and game_index % 2:
+            winner, moves = play_game(field, player2, player1)
+        else:
+            winner, moves = play_game(field, player1, player2)
+        stats.add(winner, moves)
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Быстрые партии бот-против-бота без pygame")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--y-size", type=int, default=3)
+    parser.add_argument("--x-size", type=int, default=3)
+    parser.add_argument("--win-length", type=int, default=None)
+    parser.add_argument("--backend", default="cells")
+    parser.add_argument("--player1", default="bot")
+    parser.add_argument("--player2", default="bot")
+    parser.add_argument("--time-limit", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--profile", default=None, metavar="PATH",
+                        help="замерить горячие методы и сохранить отчёт (.json или chrome trace при --trace)")
+    parser.add_argument("--trace", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.profile:
+        profiling.enable(args.trace, args.profile, "chrome" if args.trace else "json")
+
+    settings = {'time_limit': args.time_limit}
+    stats = simulate(
+        args.games, args.y_size, args.x_size, args.win_length, args.backend,
+        args.player1, args.player2, settings, settings, args.seed
+    )
+    print(stats.report())
+    search = format_stats(engine_stats())
+    if search:
+        print(search)
+    if profiling.is_enabled():
+        print(profiling.PROFILER.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# symmetry.py
+from collections import OrderedDict
+
+
+def symmetry_permutations(y_size, x_size):
+    # perm[i] — куда переходит клетка i: 8 симметрий для квадратного поля, 4 для прямоугольного
+    transforms = [
+        lambda r, c: (r, c),
+        lambda r, c: (r, x_size - 1 - c),
+        lambda r, c: (y_size - 1 - r, c),
+        lambda r, c: (y_size - 1 - r, x_size - 1 - c),
+    ]
+    if x_size == y_size:
+        n = x_size
+        transforms += [
+            lambda r, c: (c, r),
+            lambda r, c: (n - 1 - c, n - 1 - r),
+            lambda r, c: (c, n - 1 - r),
+            lambda r, c: (n - 1 - c, r),
+        ]
+
+    perms = []
+    for transform in transforms:
+        perm = []
+        for index in range(y_size * x_size):
+            r, c = transform(index // x_size, index % x_size)
+            perm.append(r * x_size + c)
+        perm = tuple(perm)
+        if perm not in perms:
+            perms.append(perm)
+    return perms
+
+
+def inverse_permutation(perm):
+    inverse = [0] * len(perm)
+    for index, image in enumerate(perm):
+        inverse[image] = index
+    return tuple(inverse)
+
+
+def canonical_form(cells, perms):
+    # Представитель класса позиций: лексикографически наименьшая из симметричных копий.
+    # Возвращает (форма, номер симметрии), чтобы ход можно было перевести обратно
+    best = None
+    best_sym = 0
+    for sym, perm in enumerate(perms):
+        image = [None] * len(cells)
+        for index, value in enumerate(cells):
+            image[perm[index]] = value
+        image = tuple(image)
+        if best is None or image < best:
+            best = image
+            best_sym = sym
+    return best, best_sym
+
+
+def grid_cells(field, symbol):
+    # Клетки поля относительно игрока: 1 — свой символ, 2 — чужой, 0 — пусто
+    cells = []
+    for row in field.grid:
+        for cell in row:
+            if cell.symbol == " ":
+                cells.append(0)
+            elif cell.symbol == symbol:
+                cells.append(1)
+            else:
+                cells.append(2)
+    return tuple(cells)
+
+
+class PositionCache:
+    # LRU-кэш оценённых позиций, ключ — каноническая форма
+    def __init__(self, max_size=100000):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self.entries)}
+
+    def __len__(self):
+        return len(self.entries)
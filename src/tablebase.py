@@ -0,0 +1,194 @@
+# tablebase.py
+# Таблица идеальной игры: решаем поле целиком обратным анализом и пишем компактный бинарный файл.
+#
+# Формат файла (little-endian):
+#   magic b"TTTB", версия (H), y_size (B), x_size (B), win_length (B, 0 — классические правила)
+#   затем 3 ** (y_size * x_size) байт — по одному на каждую позицию.
+# Индекс позиции — число в троичной системе: цифра клетки i равна 0 (пусто),
+# 1 (камень первого игрока) или 2 (камень второго). Байт: младшие 6 бит — лучший ход,
+# старшие 2 бита — оценка для ходящего (0 — нет в таблице, 1 — выигрыш, 2 — ничья, 3 — проигрыш).
+import argparse
+import mmap
+import os
+import struct
+from .logic import build_line_masks, build_cell_lines
+from .symmetry import symmetry_permutations
+
+MAGIC = b"TTTB"
+VERSION = 1
+HEADER = struct.Struct("<4sHBBB")
+MAX_CELLS = 16
+
+UNKNOWN, WIN, DRAW, LOSS = 0, 1, 2, 3
+
+
+class TablebaseError(Exception):
+    pass
+
+
+def default_path(y_size, x_size, win_length=None):
+    suffix = f"_k{win_length}" if win_length else ""
+    return f"tablebase_{y_size}x{x_size}{suffix}.ttb"
+
+
+def solve(y_size, x_size, win_length=None):
+    # Обратный анализ по слоям: сначала перечисляем все достижимые позиции (с точностью до симметрии),
+    # затем идём от заполненных слоёв к пустому полю, оценивая позицию по уже решённым потомкам.
+    # Возвращает {канонический индекс: (счёт, лучший ход)}; счёт > 0 — выигрыш ходящего
+    total = y_size * x_size
+    if total > MAX_CELLS:
+        raise TablebaseError(f"Поле {y_size}x{x_size} слишком большое для таблицы (максимум {MAX_CELLS} клеток)")
+
+    cell_lines = build_cell_lines(y_size, x_size, build_line_masks(y_size, x_size, win_length))
+    perms = symmetry_permutations(y_size, x_size)
+    # deltas[color][i] — на сколько меняется троичный индекс каждой симметричной копии от камня в клетке i
+    deltas = [
+        [tuple((color + 1) * 3 ** perm[i] for perm in perms) for i in range(total)]
+        for color in (0, 1)
+    ]
+
+    def is_win(board, index):
+        for mask in cell_lines[index]:
+            if board & mask == mask:
+                return True
+        return False
+
+    empty_keys = (0,) * len(perms)
+    layers = [{0: (0, 0, empty_keys, False)}]
+    for stones in range(total):
+        color = stones % 2
+        layer = {}
+        for b0, b1, keys, terminal in layers[-1].values():
+            if terminal:
+                continue
+            occupied = b0 | b1
+            for index in range(total):
+                if occupied >> index & 1:
+                    continue
+                child_keys = tuple(k + d for k, d in zip(keys, deltas[color][index]))
+                key = min(child_keys)
+                if key in layer:
+                    continue
+                if color == 0:
+                    board = b0 | 1 << index
+                    layer[key] = (board, b1, child_keys, is_win(board, index))
+                else:
+                    board = b1 | 1 << index
+                    layer[key] = (b0, board, child_keys, is_win(board, index))
+        layers.append(layer)
+
+    solved = {}
+    for stones in range(len(layers) - 1, -1, -1):
+        color = stones % 2
+        for key, (b0, b1, keys, terminal) in layers[stones].items():
+            if terminal:
+                solved[key] = (-100, None)
+                continue
+            occupied = b0 | b1
+            best_score = None
+            best_move = None
+            for index in range(total):
+                if occupied >> index & 1:
+                    continue
+                child_key = min(k + d for k, d in zip(keys, deltas[color][index]))
+                score = -solved[child_key][0]
+                if best_score is None or score > best_score:
+                    best_score = score
+                    best_move = index
+            if best_move is None:
+                solved[key] = (0, None)
+                continue
+            # Чем дальше конец партии, тем ближе счёт к нулю: выигрыш берём быстрее, проигрыш оттягиваем
+            if best_score > 0:
+                best_score -= 1
+            elif best_score < 0:
+                best_score += 1
+            solved[key] = (best_score, best_move)
+    return solved, layers, perms
+
+
+def build(y_size, x_size, win_length=None, path=None):
+    path = path or default_path(y_size, x_size, win_length)
+    solved, layers, perms = solve(y_size, x_size, win_length)
+    total = y_size * x_size
+
+    table = bytearray(3 ** total)
+    for layer in layers:
+        for key, (b0, b1, keys, terminal) in layer.items():
+            score, move = solved[key]
+            if terminal or move is None:
+                continue
+            value = WIN if score > 0 else LOSS if score < 0 else DRAW
+            # Записываем и все симметричные копии, чтобы поиск не тратил время на канонизацию
+            for perm, index in zip(perms, keys):
+                table[index] = value << 6 | perm[move]
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, y_size, x_size, win_length or 0))
+        f.write(table)
+    os.replace(tmp_path, path)
+    return path, sum(len(layer) for layer in layers)
+
+
+class Tablebase:
+    def __init__(self, path, y_size, x_size, win_length=None):
+        self.y_size = y_size
+        self.x_size = x_size
+        with open(path, 'rb') as f:
+            header = f.read(HEADER.size)
+            if len(header) != HEADER.size:
+                raise TablebaseError(f"Файл '{path}' не является таблицей")
+            magic, version, file_y, file_x, file_k = HEADER.unpack(header)
+            if magic != MAGIC or version != VERSION:
+                raise TablebaseError(f"Файл '{path}': неизвестный формат или версия {version}")
+            if (file_y, file_x, file_k) != (y_size, x_size, win_length or 0):
+                raise TablebaseError(
+                    f"Таблица '{path}' построена для поля {file_y}x{file_x} (win_length={file_k or None})"
+                )
+            if os.fstat(f.fileno()).st_size != HEADER.size + 3 ** (y_size * x_size):
+                raise TablebaseError(f"Таблица '{path}' повреждена")
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.powers = [3 ** i for i in range(y_size * x_size)]
+
+    def lookup(self, codes):
+        # codes[i]: 0 — пусто, 1 — первый игрок, 2 — второй. Возвращает (оценка, ход) или None
+        index = 0
+        for code, power in zip(codes, self.powers):
+            if code:
+                index += code * power
+        entry = self.data[HEADER.size + index]
+        value = entry >> 6
+        if value == UNKNOWN:
+            return None
+        return value, entry & 63
+
+    def close(self):
+        self.data.close()
+
+
+_TABLES = {}
+
+
+def load_tablebase(path, y_size, x_size, win_length=None):
+    key = (os.path.abspath(path), y_size, x_size, win_length)
+    table = _TABLES.get(key)
+    if table is None:
+        table = _TABLES[key] = Tablebase(path, y_size, x_size, win_length)
+    return table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Построение таблицы идеальной игры для поля y_size x x_size")
+    parser.add_argument("y_size", type=int)
+    parser.add_argument("x_size", type=int)
+    parser.add_argument("--win-length", type=int, default=None)
+    parser.add_argument("-o", "--output", default=None)
+    args = parser.parse_args(argv)
+
+    path, positions = build(args.y_size, args.x_size, args.win_length, args.output)
+    print(f"Таблица записана в '{path}': {positions} позиций (с точностью до симметрии)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+# tournament.py
+# Круговой турнир ботов на нескольких размерах поля, партии распределяются по всем ядрам
+import argparse
+import itertools
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from .logic import create_field
+from .players import create_player
+from .search import engine_stats, format_stats, merge_stats, reset_engines
+from .simulate import play_game
+
+
+def parse_board(text):
+    # "4x4" или "15x15:5" (через двоеточие — win_length)
+    size, _, win_length = text.partition(":")
+    y_size, x_size = (int(part) for part in size.lower().split("x"))
+    return y_size, x_size, int(win_length) if win_length else None
+
+
+def board_name(board):
+    y_size, x_size, win_length = board
+    return f"{y_size}x{x_size}" + (f":{win_length}" if win_length else "")
+
+
+def game_seed(base_seed, board, first, second, game_index):
+    # Сид зависит только от параметров партии, поэтому результат не зависит от числа процессов
+    return f"{base_seed}:{board_name(board)}:{first}:{second}:{game_index}"
+
+
+def play_chunk(task):
+    # Выполняется в процессе-воркере: играет пачку партий и возвращает только суммы
+    board, first, second, start, count, base_seed, settings, backend = task
+    y_size, x_size, win_length = board
+    wins_first = wins_second = draws = total_moves = 0
+    search = {}
+    for game_index in range(start, start + count):
+        rng = random.Random(game_seed(base_seed, board, first, second, game_index))
+        # Счётчики таблиц прошлой партии забираем до сброса движков
+        merge_stats(search, engine_stats())
+        reset_engines()
+        player_a = create_player(first, first, "X", settings, rng)
+        player_b = create_player(second, second, "O", settings, rng)
+        field = create_field(y_size, x_size, backend, win_length)
+        # Первый ход по очереди
+        if game_index % 2:
+            winner, moves = play_game(field, player_b, player_a)
+        else:
+            winner, moves = play_game(field, player_a, player_b)
+        total_moves += moves
+        if winner == "X":
+            wins_first += 1
+        elif winner == "O":
+            wins_second += 1
+        else:
+            draws += 1
+    merge_stats(search, engine_stats())
+    reset_engines()
+    return board, first, second, wins_first, wins_second, draws, total_moves, search
+
+
+def make_tasks(bots, boards, games, chunk_size, base_seed, settings, backend):
+    tasks = []
+    for board in boards:
+        for first, second in itertools.combinations(bots, 2):
+            for start in range(0, games, chunk_size):
+                count = min(chunk_size, games - start)
+                tasks.append((board, first, second, start, count, base_seed, settings, backend))
+    return tasks
+
+
+class Standings:
+    def __init__(self, bots):
+        self.bots = list(bots)
+        # results[(a, b)] = [очки a, партий] — ничья даёт пол-очка
+        self.results = {}
+        self.wins = {bot: 0 for bot in bots}
+        self.draws = {bot: 0 for bot in bots}
+        self.losses = {bot: 0 for bot in bots}
+        self.total_moves = 0
+        self.games = 0
+
+    def add(self, first, second, wins_first, wins_second, draws, total_moves):
+        games = wins_first + wins_second + draws
+        for a, b, won, lost in ((first, second, wins_first, wins_second), (second, first, wins_second, wins_first)):
+            entry = self.results.setdefault((a, b), [0.0, 0])
+            entry[0] += won + draws / 2
+            entry[1] += games
+            self.wins[a] += won
+            self.losses[a] += lost
+            self.draws[a] += draws
+        self.total_moves += total_moves
+        self.games += games
+
+    def elo(self, iterations=200, k=16):
+        # Подбираем рейтинги так, чтобы ожидаемые очки сошлись с набранными
+        ratings = {bot: 1500.0 for bot in self.bots}
+        for _ in range(iterations):
+            for bot in self.bots:
+                delta = 0.0
+                games = 0
+                for (a, b), (score, played) in self.results.items():
+                    if a != bot or not played:
+                        continue
+                    expected = 1 / (1 + 10 ** ((ratings[b] - ratings[a]) / 400))
+                    delta += score - expected * played
+                    games += played
+                if games:
+                    ratings[bot] += k * delta / games * len(self.bots)
+        mean = sum(ratings.values()) / len(ratings)
+        return {bot: rating - mean + 1500 for bot, rating in ratings.items()}
+
+    def table(self):
+        ratings = self.elo()
+        lines = [f"{'бот':<12}{'партий':>8}{'W':>7}{'D':>7}{'L':>7}{'очки %':>9}{'Elo':>7}"]
+        for bot in sorted(self.bots, key=lambda b: -ratings[b]):
+            played = self.wins[bot] + self.draws[bot] + self.losses[bot]
+            score = (self.wins[bot] + self.draws[bot] / 2) / played * 100 if played else 0.0
+            lines.append(
+                f"{bot:<12}{played:>8}{self.wins[bot]:>7}{self.draws[bot]:>7}{self.losses[bot]:>7}"
+                f"{score:>9.1f}{ratings[bot]:>7.0f}"
+            )
+        return "\n".join(lines)
+
+
+def run_tournament(bots, boards, games=100, chunk_size=50, seed=0, settings=None,
+                   backend="cells", workers=None):
+    tasks = make_tasks(bots, boards, games, chunk_size, seed, settings or {}, backend)
+    per_board = {board: Standings(bots) for board in boards}
+    overall = Standings(bots)
+    search = {}
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        for board, first, second, *totals, chunk_search in pool.map(play_chunk, tasks):
+            per_board[board].add(first, second, *totals)
+            overall.add(first, second, *totals)
+            merge_stats(search, chunk_search)
+    elapsed = time.perf_counter() - start
+    return per_board, overall, elapsed, search
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Круговой турнир ботов на пуле процессов")
+    parser.add_argument("--bots", default="bot,minimax", help="типы ботов через запятую")
+    parser.add_argument("--boards", default="3x3,4x4", help="размеры полей через запятую, например 3x3,15x15:5")
+    parser.add_argument("--games", type=int, default=100, help="партий на каждую пару ботов и поле")
+    parser.add_argument("--chunk-size", type=int, default=50)
+    # Бюджет хода — в узлах перебора и доигровках, а не в секундах: иначе исход партий зависит
+    # от загрузки машины и сид партии ничего не гарантирует
+    parser.add_argument("--max-nodes", type=int, default=1000, help="узлов перебора minimax на ход")
+    parser.add_argument("--iterations", type=int, default=1000, help="доигровок mcts на ход")
+    parser.add_argument("--time-limit", type=float, default=None,
+                        help="добавить лимит времени на ход (результат перестаёт воспроизводиться)")
+    parser.add_argument("--backend", default="cells")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    bots = [bot.strip() for bot in args.bots.split(",") if bot.strip()]
+    boards = [parse_board(board) for board in args.boards.split(",") if board.strip()]
+    per_board, overall, elapsed, search = run_tournament(
+        bots, boards, args.games, args.chunk_size, args.seed,
+        {'time_limit': args.time_limit, 'max_nodes': args.max_nodes, 'iterations': args.iterations},
+        args.backend, args.workers
+    )
+
+    for board in boards:
+        print(f"\nПоле {board_name(board)}:")
+        print(per_board[board].table())
+    print("\nИтог:")
+    print(overall.table())
+    print(f"\n{overall.games} партий за {elapsed:.2f} с ({overall.games / elapsed:.0f} партий/с)")
+    search_line = format_stats(search)
+    if search_line:
+        print(search_line)
+
+
+if __name__ == "__main__":
+    main()